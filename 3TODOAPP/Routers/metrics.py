@@ -0,0 +1,20 @@
+from typing import Annotated
+
+from database import pool_metrics
+from fastapi import APIRouter, Depends, HTTPException
+from starlette import status
+
+from .auth import get_current_user
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
+
+@router.get("/db-pool", status_code=status.HTTP_200_OK)
+async def read_pool_metrics(user: user_dependency):
+    # Admin only: the snapshot exposes pool sizing and, with tracing on, code paths.
+    if user is None or user.get("user_role") != "admin":
+        raise HTTPException(status_code=401, detail="Authentication Failed")
+    # Per worker process: checked-out count, wait histogram and long-held connections.
+    return pool_metrics.snapshot()
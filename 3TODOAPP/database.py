@@ -1,10 +1,47 @@
+import os
+
+from pool_metrics import PoolMetrics, TimedQueuePool
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+
+def _flag(name, default):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
 # postgresql://<username>:<password>@localhost:<port>/<database>
-SQLALCHEMY_DATABASE_URL = "postgresql://postgres:ai@localhost:5432/todoapp"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
- # Establishing the connection to the database and create a session
+SQLALCHEMY_DATABASE_URL = os.environ.get(
+    "DATABASE_URL", "postgresql://postgres:ai@localhost:5432/todoapp"
+)
+
+# Pool settings are per worker process: size the database's max_connections
+# for workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", -1))  # seconds, -1 = never
+DB_POOL_PRE_PING = _flag("DB_POOL_PRE_PING", False)
+
+# A connection checked out longer than this is reported as a probable leak;
+# DB_POOL_TRACE_CHECKOUTS also records the stack that checked it out.
+DB_POOL_LEAK_SECONDS = float(os.environ.get("DB_POOL_LEAK_SECONDS", 30))
+DB_POOL_TRACE_CHECKOUTS = _flag("DB_POOL_TRACE_CHECKOUTS", False)
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+pool_metrics = PoolMetrics(
+    engine,
+    leak_seconds=DB_POOL_LEAK_SECONDS,
+    trace_checkouts=DB_POOL_TRACE_CHECKOUTS,
+)
+# Establishing the connection to the database and create a session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,7 +1,7 @@
 import models
 from database import engine
 from fastapi import FastAPI
-from Routers import auth, todos, admin
+from Routers import auth, todos, admin, metrics
 
 app = FastAPI()
 # Create the database using below command at the terminal:
@@ -11,4 +11,5 @@ models.Base.metadata.create_all(bind=engine)
 app.include_router(auth.router)
 app.include_router(todos.router)
 app.include_router(admin.router)
+app.include_router(metrics.router)
 # app.include_router(users.router)
@@ -0,0 +1,180 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last is +Inf.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection.
+
+    The wait covers queueing for a free connection and opening an overflow
+    one; SQLAlchemy has no pool event for it, so it is timed around ``_do_get``.
+    """
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return record
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same place.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """Connection pool saturation, wait times and long-held connections.
+
+    Attach it to an engine built with ``poolclass=TimedQueuePool``. Pool events
+    keep the counters; a connection checked out for longer than
+    ``leak_seconds`` is reported as a probable leak, with the stack that
+    checked it out when ``trace_checkouts`` is on. All numbers are for this
+    process only, so with N workers the database sees up to N times
+    ``pool_size + max_overflow`` connections.
+    """
+
+    def __init__(self, engine, leak_seconds=30.0, trace_checkouts=False):
+        self.engine = engine
+        self.leak_seconds = leak_seconds
+        self.trace_checkouts = trace_checkouts
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+        self._held = {}
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.leaks = 0
+        self.max_checked_out = 0
+
+        engine.pool.metrics = self
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def observe_wait(self, seconds):
+        with self._lock:
+            self._buckets[bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+            self._wait_sum += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def observe_timeout(self, seconds):
+        self.observe_wait(seconds)
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        pool = self.engine.pool
+        now = time.monotonic()
+        with self._lock:
+            waits = sum(self._buckets)
+            held = sorted(self._held.values(), key=lambda checkout: checkout["since"])
+            return {
+                "pid": os.getpid(),
+                "pool": {
+                    "size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "timeout_s": pool.timeout(),
+                    "recycle_s": pool._recycle,
+                    "pre_ping": pool._pre_ping,
+                },
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_checked_out": self.max_checked_out,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_ms": {
+                    "count": waits,
+                    "sum": self._wait_sum * 1000,
+                    "max": self._wait_max * 1000,
+                    "buckets": {
+                        **{
+                            str(bound): count
+                            for bound, count in zip(WAIT_BUCKETS_MS, self._buckets)
+                        },
+                        "+Inf": self._buckets[-1],
+                    },
+                },
+                "leaks": self.leaks,
+                "long_held": [
+                    {
+                        "held_s": round(now - checkout["since"], 3),
+                        "thread": checkout["thread"],
+                        "stack": checkout["stack"],
+                    }
+                    for checkout in held
+                    if now - checkout["since"] >= self.leak_seconds
+                ],
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        checkout = {
+            "since": time.monotonic(),
+            "thread": threading.current_thread().name,
+            "stack": _caller_stack() if self.trace_checkouts else None,
+        }
+        with self._lock:
+            self._held[id(connection_record)] = checkout
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, len(self._held))
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            checkout = self._held.pop(id(connection_record), None)
+        if checkout is None:
+            return
+        held = time.monotonic() - checkout["since"]
+        if held >= self.leak_seconds:
+            with self._lock:
+                self.leaks += 1
+            logger.warning(
+                "Connection held for %.1fs (leak threshold %.1fs) by %s\n%s",
+                held,
+                self.leak_seconds,
+                checkout["thread"],
+                "".join(checkout["stack"] or ()),
+            )
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+def _caller_stack(limit=15):
+    # The application frames that asked for the connection, without the
+    # SQLAlchemy pool machinery between them and this event handler.
+    frames = traceback.extract_stack()[:-2]
+    while frames and f"{os.sep}sqlalchemy{os.sep}" in frames[-1].filename:
+        frames.pop()
+    return traceback.format_list(frames[-limit:])
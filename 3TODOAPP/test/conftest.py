@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# The app imports its modules as top-level ones (``from database import ...``)
+# and connects at import time, so point it at a throwaway SQLite file first.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'todoapp.db')}"
+)
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pool_metrics import PoolMetrics, TimedQueuePool
+from Routers import metrics
+from Routers.auth import get_current_user
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette import status
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=TimedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_metrics_report_saturation_and_leaks(engine):
+    pool_metrics = PoolMetrics(engine, leak_seconds=0.05, trace_checkouts=True)
+    first, second = engine.connect(), engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["checked_out"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_ms"]["count"] == 3
+    assert snapshot["wait_ms"]["max"] >= 200
+    assert snapshot["wait_ms"]["buckets"]["250"] == 1
+    assert len(snapshot["long_held"]) == 2
+    assert "test_pool_metrics_report_saturation_and_leaks" in "".join(
+        snapshot["long_held"][0]["stack"]
+    )
+
+    first.close()
+    second.close()
+    assert pool_metrics.snapshot()["leaks"] == 2
+
+    # dispose() swaps in a new pool, which must keep reporting here.
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["checkouts"] == 3
+    assert snapshot["wait_ms"]["count"] == 4
+    assert snapshot["checked_out"] == 0
+    assert snapshot["long_held"] == []
+
+
+def test_pool_metrics_route_is_admin_only():
+    app = FastAPI()
+    app.include_router(metrics.router)
+    client = TestClient(app)
+
+    assert client.get("/metrics/db-pool").status_code == status.HTTP_401_UNAUTHORIZED
+
+    app.dependency_overrides[get_current_user] = lambda: {
+        "username": "user",
+        "id": 2,
+        "user_role": "user",
+    }
+    assert client.get("/metrics/db-pool").status_code == status.HTTP_401_UNAUTHORIZED
+
+    app.dependency_overrides[get_current_user] = lambda: {
+        "username": "admin",
+        "id": 1,
+        "user_role": "admin",
+    }
+    response = client.get("/metrics/db-pool")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["pool"]["size"] == 5
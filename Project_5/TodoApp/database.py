@@ -1,11 +1,199 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import os
+import re
+import time
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
-SQLALCHEMY_DATABASE_URL = 'sqlite:///./todosapp.db'
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = os.environ.get('TODOAPP_DATABASE_URL', 'sqlite:///./todosapp.db')
+
+# Async DBAPI driver used for each backend by the request-serving engine.
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """The same database as ``url``, reached through its async driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend!r} databases')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+# PRAGMAs run on every new SQLite connection. busy_timeout goes first so the
+# switch to WAL waits for other connections' locks instead of failing.
+SQLITE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',  # readers no longer block behind a writer
+        'synchronous': 'NORMAL',  # safe with WAL; fsync at checkpoints only
+        'cache_size': -64000,  # KiB, i.e. 64 MB of page cache per connection
+        'mmap_size': 268435456,  # read pages through a 256 MB memory map
+        'temp_store': 'MEMORY',
+    },
+}
+
+SQLITE_PROFILE = os.environ.get('TODOAPP_SQLITE_PROFILE', 'tuned')
+
+# Extra or replacement PRAGMAs, e.g. "cache_size=-128000,mmap_size=0".
+SQLITE_PRAGMA_OVERRIDES = os.environ.get('TODOAPP_SQLITE_PRAGMAS', '')
+
+
+def sqlite_pragmas(profile, overrides=''):
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown SQLite profile {profile!r}; expected one of {sorted(SQLITE_PROFILES)}')
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for item in filter(None, overrides.split(',')):
+        name, _, value = (part.strip() for part in item.partition('='))
+        if not re.fullmatch(r'\w+', name) or not re.fullmatch(r'-?\w+', value):
+            raise ValueError(f'Invalid SQLite PRAGMA {item!r}')
+        pragmas[name] = value
+    return pragmas
+
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={'check_same_thread': False})
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``pragmas`` on every connection ``engine`` opens (SQLite only)."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+SQLITE_PRAGMAS = sqlite_pragmas(SQLITE_PROFILE, SQLITE_PRAGMA_OVERRIDES)
+
+
+def connect_args(url):
+    if make_url(url).get_backend_name() == 'sqlite':
+        return {'check_same_thread': False}
+    return {}
+
+
+# Sync engine: schema creation, alembic and scripts.
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args(SQLALCHEMY_DATABASE_URL))
+
+apply_sqlite_pragmas(engine, SQLITE_PRAGMAS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: used by the routers, so a query in flight never blocks the event loop.
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL))
+
+apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+
+
+
+class TimedSession(Session):
+    """Session that records connection checkout timing into ``info['timing']``."""
+
+
+class SessionTiming:
+    """How one request used its database session; all durations in seconds."""
+
+    def __init__(self):
+        self.opened = None
+        self.closed = None
+        self.checkouts = 0
+        self.checkout_wait = 0.0
+        self.connection_held = 0.0
+        self._requested = None
+        self._acquired = None
+
+    def __str__(self):
+        return (f'session {(self.closed - self.opened) * 1000:.1f} ms, {self.checkouts} checkout(s), '
+                f'waited {self.checkout_wait * 1000:.1f} ms, held {self.connection_held * 1000:.1f} ms')
+
+
+# A session asks for a connection when it starts a transaction and hands it
+# back when the transaction ends.
+@event.listens_for(TimedSession, 'after_transaction_create')
+def _connection_requested(session, transaction):
+    timing = session.info.get('timing')
+    if timing is not None and transaction.parent is None:
+        timing._requested = time.perf_counter()
+
+
+@event.listens_for(TimedSession, 'after_begin')
+def _connection_acquired(session, transaction, connection):
+    timing = session.info.get('timing')
+    if timing is not None and timing._requested is not None:
+        timing._acquired = time.perf_counter()
+        timing.checkouts += 1
+        timing.checkout_wait += timing._acquired - timing._requested
+        timing._requested = None
+
+
+@event.listens_for(TimedSession, 'after_transaction_end')
+def _connection_released(session, transaction):
+    timing = session.info.get('timing')
+    if timing is not None and transaction.parent is None:
+        if timing._acquired is not None:
+            timing.connection_held += time.perf_counter() - timing._acquired
+        timing._requested = timing._acquired = None
+
+
+class LazySession:
+    """Stands in for an AsyncSession and only opens one when first used.
+
+    Requests rejected before their handler touches the database (auth
+    failures, validation errors, redirects) never create a session or check
+    a connection out of the pool.
+    """
+
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self._session = None
+        self.timing = SessionTiming()
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self.timing.opened = time.perf_counter()
+            self._session = self._session_factory(info={'timing': self.timing})
+        return getattr(self._session, name)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self.timing.closed = time.perf_counter()
+
+
+def session_dependency(session_factory):
+    """Request-scoped session dependency drawing from ``session_factory``.
+
+    FastAPI caches a dependency per request, so every router dependency and
+    handler in one request shares the same session.
+    """
+    async def get_db(request: Request):
+        db = LazySession(session_factory)
+        request.state.db_timing = db.timing
+        try:
+            yield db
+        finally:
+            await db.close()
+            if db.timing.closed is not None:
+                logger.debug('%s %s: %s', request.method, request.url.path, db.timing)
+
+    return get_db
+
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, sync_session_class=TimedSession,
+                                       autoflush=False, expire_on_commit=False)
+
+get_db = session_dependency(AsyncSessionLocal)
+
 Base = declarative_base()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: report every stretch longer than this many ms in which the event loop
+# could not run anything else. Unset, 0 or a negative value disables the monitor.
+LOOP_MONITOR_MS = float(os.environ.get('TODOAPP_LOOP_MONITOR_MS') or 0)
+
+
+class LoopMonitorMiddleware:
+    """Marks where a request runs, so a stalled loop's stack names its route.
+
+    It does nothing per request: the watchdog finds this ``__call__`` frame in
+    the blocked stack and reads the route from its ``scope``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures whatever blocks the loop.
+
+    A heartbeat task sleeps for ``interval`` and records how late it wakes up.
+    A watchdog thread checks the last heartbeat; once the loop has been stuck
+    for ``threshold_ms`` it grabs the loop thread's stack via
+    ``sys._current_frames()``, which still shows the blocking call. When the
+    loop comes back the stall is stored with its full duration and logged.
+    """
+
+    def __init__(self, threshold_ms=100, keep_stalls=50, keep_samples=1000):
+        if threshold_ms <= 0:
+            # A zero interval would busy-spin the watchdog and report every heartbeat.
+            raise ValueError(f'threshold_ms must be positive, got {threshold_ms!r}')
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 2
+        self.stalls = deque(maxlen=keep_stalls)
+        self.stall_count = 0
+        self._lags = deque(maxlen=keep_samples)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._last_beat = None
+        self._loop_thread = None
+        self._heartbeat_task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-monitor', daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._watchdog.join()
+
+    def snapshot(self):
+        lags = sorted(self._lags)
+        return {
+            'enabled': True,
+            'threshold_ms': self.threshold * 1000,
+            'lag_ms': {
+                'samples': len(lags),
+                'p50': statistics.median(lags) * 1000 if lags else None,
+                'p99': lags[int(len(lags) * 0.99)] * 1000 if lags else None,
+                'max': lags[-1] * 1000 if lags else None,
+            },
+            'stall_count': self.stall_count,
+            'stalls': list(reversed(self.stalls)),
+        }
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            with self._lock:
+                self._last_beat = now
+                stall, self._pending = self._pending, None
+            if stall is not None or lag >= self.threshold:
+                self._finish(stall or self._stall(None), lag)
+
+    def _watch(self):
+        while not self._stopped.wait(self.threshold / 4):
+            with self._lock:
+                if self._pending is not None:
+                    continue
+                if time.monotonic() - self._last_beat < self.interval + self.threshold:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                self._pending = self._stall(frame)
+
+    def _stall(self, frame):
+        return {
+            'at': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': None,
+            'route': _route(frame),
+            'stack': traceback.format_stack(frame) if frame is not None else None,
+        }
+
+    def _finish(self, stall, lag):
+        stall['duration_ms'] = round(lag * 1000, 1)
+        self.stall_count += 1
+        self.stalls.append(stall)
+        logger.warning('Event loop blocked for %.0f ms in %s\n%s', stall['duration_ms'],
+                       stall['route'] or 'no request', ''.join(stall['stack'] or ()))
+
+
+def _route(frame):
+    # The LoopMonitorMiddleware frame in the blocked stack holds the request's scope.
+    while frame is not None:
+        if frame.f_code is LoopMonitorMiddleware.__call__.__code__:
+            scope = frame.f_locals.get('scope') or {}
+            route = scope.get('route')
+            return f"{scope.get('method', '')} {getattr(route, 'path', scope.get('path'))}".strip()
+        frame = frame.f_back
+    return None
@@ -1,11 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from .models import Base
 from .database import engine
+from .diagnostics import LOOP_MONITOR_MS, LoopMonitor, LoopMonitorMiddleware
 from .routers import auth, todos, admin, users
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = getattr(app.state, 'loop_monitor', None)
+    if monitor is None:
+        yield
+        return
+    async with monitor:
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+if LOOP_MONITOR_MS > 0:
+    app.state.loop_monitor = LoopMonitor(threshold_ms=LOOP_MONITOR_MS)
+    app.add_middleware(LoopMonitorMiddleware)
 
 Base.metadata.create_all(bind=engine)
 
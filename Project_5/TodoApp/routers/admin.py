@@ -1,10 +1,11 @@
 from typing import Annotated
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, Path
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
 from starlette import status
 from ..models import Todos
-from ..database import SessionLocal
+from ..database import get_db
 from .auth import get_current_user
 
 router = APIRouter(
@@ -13,15 +14,7 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
@@ -29,22 +22,26 @@ user_dependency = Annotated[dict, Depends(get_current_user)]
 async def read_all(user: user_dependency, db: db_dependency):
     if user is None or user.get('user_role') != 'admin':
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    return db.query(Todos).all()
+    result = await db.execute(select(Todos))
+    return result.scalars().all()
 
 
 @router.delete("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_todo(user: user_dependency, db: db_dependency, todo_id: int = Path(gt=0)):
     if user is None or user.get('user_role') != 'admin':
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    todo_model = db.query(Todos).filter(Todos.id == todo_id).first()
+    todo_model = await db.scalar(select(Todos).where(Todos.id == todo_id))
     if todo_model is None:
         raise HTTPException(status_code=404, detail='Todo not found.')
-    db.query(Todos).filter(Todos.id == todo_id).delete()
-    db.commit()
-
-
-
-
-
+    await db.execute(delete(Todos).where(Todos.id == todo_id))
+    await db.commit()
 
 
+@router.get("/diagnostics/event-loop", status_code=status.HTTP_200_OK)
+async def event_loop_diagnostics(user: user_dependency, request: Request):
+    if user is None or user.get('user_role') != 'admin':
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    monitor = getattr(request.app.state, 'loop_monitor', None)
+    if monitor is None:
+        return {'enabled': False}
+    return monitor.snapshot()
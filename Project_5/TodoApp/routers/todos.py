@@ -1,10 +1,11 @@
 from typing import Annotated
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
 from starlette import status
 from ..models import Todos
-from ..database import SessionLocal
+from ..database import get_db
 from .auth import get_current_user
 from starlette.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -17,15 +18,7 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
@@ -52,7 +45,7 @@ async def render_todo_page(request: Request, db: db_dependency):
         if user is None:
             return redirect_to_login()
 
-        todos = db.query(Todos).filter(Todos.owner_id == user.get("id")).all()
+        todos = (await db.scalars(select(Todos).where(Todos.owner_id == user.get("id")))).all()
 
         return templates.TemplateResponse("todo.html", {"request": request, "todos": todos, "user": user})
 
@@ -82,7 +75,7 @@ async def render_edit_todo_page(request: Request, todo_id: int, db: db_dependenc
         if user is None:
             return redirect_to_login()
 
-        todo = db.query(Todos).filter(Todos.id == todo_id).first()
+        todo = await db.scalar(select(Todos).where(Todos.id == todo_id))
 
         return templates.TemplateResponse("edit-todo.html", {"request": request, "todo": todo, "user": user})
 
@@ -96,7 +89,8 @@ async def render_edit_todo_page(request: Request, todo_id: int, db: db_dependenc
 async def read_all(user: user_dependency, db: db_dependency):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    return db.query(Todos).filter(Todos.owner_id == user.get('id')).all()
+    result = await db.execute(select(Todos).where(Todos.owner_id == user.get('id')))
+    return result.scalars().all()
 
 
 @router.get("/todo/{todo_id}", status_code=status.HTTP_200_OK)
@@ -104,8 +98,8 @@ async def read_todo(user: user_dependency, db: db_dependency, todo_id: int = Pat
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    todo_model = db.query(Todos).filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user.get('id')).first()
+    todo_model = await db.scalar(select(Todos).where(Todos.id == todo_id)
+                                 .where(Todos.owner_id == user.get('id')))
     if todo_model is not None:
         return todo_model
     raise HTTPException(status_code=404, detail='Todo not found.')
@@ -119,7 +113,7 @@ async def create_todo(user: user_dependency, db: db_dependency,
     todo_model = Todos(**todo_request.model_dump(), owner_id=user.get('id'))
 
     db.add(todo_model)
-    db.commit()
+    await db.commit()
 
 
 @router.put("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -129,8 +123,8 @@ async def update_todo(user: user_dependency, db: db_dependency,
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    todo_model = db.query(Todos).filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user.get('id')).first()
+    todo_model = await db.scalar(select(Todos).where(Todos.id == todo_id)
+                                 .where(Todos.owner_id == user.get('id')))
     if todo_model is None:
         raise HTTPException(status_code=404, detail='Todo not found.')
 
@@ -140,7 +134,7 @@ async def update_todo(user: user_dependency, db: db_dependency,
     todo_model.complete = todo_request.complete
 
     db.add(todo_model)
-    db.commit()
+    await db.commit()
 
 
 @router.delete("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -148,13 +142,13 @@ async def delete_todo(user: user_dependency, db: db_dependency, todo_id: int = P
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    todo_model = db.query(Todos).filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user.get('id')).first()
+    todo_model = await db.scalar(select(Todos).where(Todos.id == todo_id)
+                                 .where(Todos.owner_id == user.get('id')))
     if todo_model is None:
         raise HTTPException(status_code=404, detail='Todo not found.')
-    db.query(Todos).filter(Todos.id == todo_id).filter(Todos.owner_id == user.get('id')).delete()
+    await db.execute(delete(Todos).where(Todos.id == todo_id).where(Todos.owner_id == user.get('id')))
 
-    db.commit()
+    await db.commit()
 
 
 
@@ -1,10 +1,11 @@
 from typing import Annotated
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Path
 from starlette import status
 from ..models import Users
-from ..database import SessionLocal
+from ..database import get_db
 from .auth import get_current_user
 from passlib.context import CryptContext
 
@@ -14,15 +15,7 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
@@ -36,7 +29,7 @@ class UserVerification(BaseModel):
 async def get_user(user: user_dependency, db: db_dependency):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    return db.query(Users).filter(Users.id == user.get('id')).first()
+    return await db.scalar(select(Users).where(Users.id == user.get('id')))
 
 
 @router.put("/password", status_code=status.HTTP_204_NO_CONTENT)
@@ -44,13 +37,13 @@ async def change_password(user: user_dependency, db: db_dependency,
                           user_verification: UserVerification):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    user_model = db.query(Users).filter(Users.id == user.get('id')).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user.get('id')))
 
     if not bcrypt_context.verify(user_verification.password, user_model.hashed_password):
         raise HTTPException(status_code=401, detail='Error on password change')
     user_model.hashed_password = bcrypt_context.hash(user_verification.new_password)
     db.add(user_model)
-    db.commit()
+    await db.commit()
 
 
 @router.put("/phonenumber/{phone_number}", status_code=status.HTTP_204_NO_CONTENT)
@@ -58,10 +51,10 @@ async def change_phonenumber(user: user_dependency, db: db_dependency,
                           phone_number: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    user_model = db.query(Users).filter(Users.id == user.get('id')).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user.get('id')))
     user_model.phone_number = phone_number
     db.add(user_model)
-    db.commit()
+    await db.commit()
 
 
 
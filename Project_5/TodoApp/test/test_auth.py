@@ -7,18 +7,18 @@ from fastapi import HTTPException
 
 app.dependency_overrides[get_db] = override_get_db
 
-def test_authenticate_user(test_user):
-    db = TestingSessionLocal()
-
-    authenticated_user = authenticate_user(test_user.username, 'testpassword', db)
-    assert authenticated_user is not None
-    assert authenticated_user.username == test_user.username
+@pytest.mark.asyncio
+async def test_authenticate_user(test_user):
+    async with TestingAsyncSessionLocal() as db:
+        authenticated_user = await authenticate_user(test_user.username, 'testpassword', db)
+        assert authenticated_user is not None
+        assert authenticated_user.username == test_user.username
 
-    non_existent_user = authenticate_user('WrongUserName', 'testpassword', db)
-    assert non_existent_user is False
+        non_existent_user = await authenticate_user('WrongUserName', 'testpassword', db)
+        assert non_existent_user is False
 
-    wrong_password_user = authenticate_user(test_user.username, 'wrongpassword', db)
-    assert wrong_password_user is False
+        wrong_password_user = await authenticate_user(test_user.username, 'wrongpassword', db)
+        assert wrong_password_user is False
 
 
 def test_create_access_token():
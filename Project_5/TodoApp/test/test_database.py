@@ -0,0 +1,81 @@
+import logging
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, event
+from .utils import *
+from ..database import SQLITE_PROFILES, apply_sqlite_pragmas, get_db, session_dependency, sqlite_pragmas
+from ..routers.auth import get_current_user
+
+
+def test_sqlite_pragmas_overrides():
+    pragmas = sqlite_pragmas('tuned', 'cache_size=-128000, mmap_size=0')
+    assert pragmas['journal_mode'] == 'WAL'
+    assert pragmas['cache_size'] == '-128000'
+    assert pragmas['mmap_size'] == '0'
+    assert SQLITE_PROFILES['tuned']['cache_size'] == -64000
+
+
+def test_sqlite_pragmas_rejects_bad_input():
+    with pytest.raises(ValueError):
+        sqlite_pragmas('fastest')
+    with pytest.raises(ValueError):
+        sqlite_pragmas('tuned', 'cache_size=1; DROP TABLE todos')
+
+
+def test_apply_sqlite_pragmas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine, sqlite_pragmas('tuned'))
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+        assert connection.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+        assert connection.exec_driver_sql('PRAGMA temp_store').scalar() == 2
+    engine.dispose()
+
+
+@pytest.fixture
+def checkouts():
+    counted = []
+
+    def count(dbapi_connection, connection_record, connection_proxy):
+        counted.append(connection_record)
+
+    event.listen(async_engine.sync_engine, 'checkout', count)
+    yield counted
+    event.remove(async_engine.sync_engine, 'checkout', count)
+
+
+def test_rejected_requests_never_open_a_session(checkouts):
+    opened = []
+
+    def counting_session_factory(**kw):
+        opened.append(kw)
+        return TestingAsyncSessionLocal(**kw)
+
+    app.dependency_overrides[get_db] = session_dependency(counting_session_factory)
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    try:
+        response = client.get("/todos/todo/0")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+        response = client.get("/todos/todo-page", follow_redirects=False)
+        assert response.status_code == status.HTTP_302_FOUND
+
+        response = client.get("/todos/todo/1")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+    assert len(opened) == 1
+    assert len(checkouts) == 1
+
+
+def test_session_timing_is_logged(test_todo, checkouts, caplog):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    with caplog.at_level(logging.DEBUG, logger='TodoApp.database'):
+        response = client.get("/todos/todo/1")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(checkouts) == 1
+    assert 'GET /todos/todo/1: session' in caplog.text
+    assert '1 checkout(s)' in caplog.text
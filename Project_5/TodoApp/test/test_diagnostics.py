@@ -0,0 +1,67 @@
+import time
+import pytest
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from .utils import *
+from ..diagnostics import LoopMonitor, LoopMonitorMiddleware
+from ..routers.admin import get_current_user
+
+app.dependency_overrides[get_current_user] = override_get_current_user
+
+
+def make_blocking_app(monitor):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with monitor:
+            yield
+
+    blocking_app = FastAPI(lifespan=lifespan)
+    blocking_app.add_middleware(LoopMonitorMiddleware)
+
+    @blocking_app.get("/block/{item_id}")
+    async def block_the_loop(item_id: int):
+        time.sleep(0.3)
+        return {'item_id': item_id}
+
+    return blocking_app
+
+
+def test_loop_monitor_captures_blocking_route():
+    monitor = LoopMonitor(threshold_ms=50)
+
+    with TestClient(make_blocking_app(monitor)) as blocking_client:
+        response = blocking_client.get("/block/1")
+        assert response.status_code == status.HTTP_200_OK
+        time.sleep(0.1)
+        snapshot = monitor.snapshot()
+
+    assert snapshot['stall_count'] == 1
+    stall = snapshot['stalls'][0]
+    assert stall['route'] == 'GET /block/{item_id}'
+    assert stall['duration_ms'] >= 250
+    assert 'block_the_loop' in ''.join(stall['stack'])
+
+
+@pytest.mark.parametrize("threshold_ms", [0, -5])
+def test_loop_monitor_rejects_non_positive_thresholds(threshold_ms):
+    with pytest.raises(ValueError):
+        LoopMonitor(threshold_ms=threshold_ms)
+
+
+def test_event_loop_diagnostics_disabled():
+    response = client.get("/admin/diagnostics/event-loop")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {'enabled': False}
+
+
+def test_event_loop_diagnostics_enabled():
+    app.state.loop_monitor = LoopMonitor(threshold_ms=100)
+    try:
+        response = client.get("/admin/diagnostics/event-loop")
+    finally:
+        del app.state.loop_monitor
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['enabled'] is True
+    assert response.json()['threshold_ms'] == 100
+    assert response.json()['stalls'] == []
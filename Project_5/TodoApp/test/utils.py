@@ -1,7 +1,8 @@
 from sqlalchemy import create_engine, text
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.orm import sessionmaker
-from ..database import Base
+from ..database import Base, TimedSession, session_dependency
 from ..main import app
 from fastapi.testclient import TestClient
 import pytest
@@ -18,14 +19,16 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs every request on a fresh event loop, so the async engine must
+# not keep connections around between requests.
+async_engine = create_async_engine("sqlite+aiosqlite:///./testdb.db", poolclass=NullPool)
+
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, sync_session_class=TimedSession,
+                                              autoflush=False, expire_on_commit=False)
+
 Base.metadata.create_all(bind=engine)
 
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+override_get_db = session_dependency(TestingAsyncSessionLocal)
 
 def override_get_current_user():
     return {'username': 'codingwithrobytest', 'id': 1, 'user_role': 'admin'}
@@ -0,0 +1,210 @@
+"""Throughput and event-loop stalls of the TodoApp routes as concurrency grows.
+
+Seeds a throwaway SQLite file with users and todos, then drives
+``GET /todos/`` at increasing concurrency through two apps over ASGI:
+
+* ``blocking``: the handler as it was before the async port, an ``async def``
+  calling ``db.query(...)`` on a sync Session, so each query runs on the
+  event loop itself;
+* ``async``: the real ``TodoApp`` router on an ``AsyncSession``.
+
+Alongside the load a probe hits ``/healthy`` every few milliseconds; its
+latency is how long any other request would wait behind the queries in flight.
+
+A local SQLite file answers without any network wait, which is the case the
+async port helps least. ``--latency-ms`` adds a simulated server round trip to
+every statement, slept in whichever thread runs the statement, to show the
+Postgres-like case. Raise ``--todos`` to make each query a longer table scan
+(``owner_id`` is not indexed).
+
+    cd Project_5 && python -m benchmarks.bench_concurrency --latency-ms 0 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from TodoApp.database import Base
+from TodoApp.main import app as todo_app
+from TodoApp.models import Todos, Users
+from TodoApp.routers import todos
+from TodoApp.routers.auth import get_current_user
+
+
+def seed(url, count, users):
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Users),
+            [
+                {"id": i, "username": f"user{i}", "role": "user"}
+                for i in range(1, users + 1)
+            ],
+        )
+        connection.execute(
+            insert(Todos),
+            [
+                {
+                    "title": f"Todo {i}",
+                    "description": "Benchmark todo",
+                    "priority": i % 5 + 1,
+                    "complete": False,
+                    "owner_id": i % users + 1,
+                }
+                for i in range(count)
+            ],
+        )
+    engine.dispose()
+
+
+def add_latency(engine, latency):
+    if not latency:
+        return
+
+    def round_trip(statement):
+        time.sleep(latency)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, "run_async"):
+            # aiosqlite: install the callback on its worker thread's connection.
+            dbapi_connection.run_async(lambda conn: conn.set_trace_callback(round_trip))
+        else:
+            dbapi_connection.set_trace_callback(round_trip)
+
+
+def blocking_app(url, pool_size, latency):
+    # Sessions are closed off the loop thread, so a pool smaller than the number
+    # of clients deadlocks: the loop blocks waiting for a connection that only
+    # the loop could release. Both apps get a pool big enough for every client.
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False}, pool_size=pool_size
+    )
+    add_latency(engine, latency)
+    SessionLocal = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/todos/")
+    async def read_all(db: Annotated[Session, Depends(get_db)]):
+        return db.query(Todos).filter(Todos.owner_id == 1).all()
+
+    @app.get("/healthy")
+    def health_check():
+        return {"status": "Healthy"}
+
+    return app
+
+
+def async_app(url, pool_size, latency):
+    engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://"), pool_size=pool_size
+    )
+    add_latency(engine.sync_engine, latency)
+    AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    todo_app.dependency_overrides[todos.get_db] = get_db
+    todo_app.dependency_overrides[get_current_user] = lambda: {
+        "username": "user1",
+        "id": 1,
+        "user_role": "user",
+    }
+    return todo_app
+
+
+async def drive(app, concurrency, requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        remaining = requests
+        done = asyncio.Event()
+        probes = []
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/todos/")
+                response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/healthy")
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probing = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probing
+
+    probes.sort()
+    return {
+        "requests_per_s": requests / elapsed,
+        "probe_p50_ms": statistics.median(probes) * 1000,
+        "probe_max_ms": probes[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--todos", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 5])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = "sqlite:///" + os.path.join(directory, "bench.db")
+        seed(url, args.todos, args.users)
+        pool_size = max(args.concurrency)
+
+        print(f"{os.cpu_count()} CPUs, {args.todos:,} todos, {args.users:,} users")
+        print(
+            f"{'latency':>8}  {'app':<10}{'clients':>8}{'req/s':>10}"
+            f"{'probe p50 ms':>14}{'probe max ms':>14}"
+        )
+        for latency_ms in args.latency_ms:
+            latency = latency_ms / 1000
+            apps = {
+                "blocking": blocking_app(url, pool_size, latency),
+                "async": async_app(url, pool_size, latency),
+            }
+            for name, app in apps.items():
+                for concurrency in args.concurrency:
+                    stats = asyncio.run(drive(app, concurrency, args.requests))
+                    print(
+                        f"{latency_ms:>6g}ms  {name:<10}{concurrency:>8}"
+                        f"{stats['requests_per_s']:>10.1f}"
+                        f"{stats['probe_p50_ms']:>14.1f}{stats['probe_max_ms']:>14.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
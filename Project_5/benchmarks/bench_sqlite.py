@@ -0,0 +1,157 @@
+"""Mixed read/write throughput of the TodoApp SQLite file, per tuning profile.
+
+Each profile gets a fresh database seeded with todos. Worker threads, each
+with its own pooled connection like concurrent requests, then run for a
+fixed time: a write inserts a todo and commits, and a read lists one user's
+todos. The run reports operations per second, read and write latency, and any
+"database is locked" failures.
+
+    cd Project_5 && python -m benchmarks.bench_sqlite --threads 8 --write-ratio 0.2
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from TodoApp.database import (
+    SQLITE_PROFILES,
+    Base,
+    apply_sqlite_pragmas,
+    sqlite_pragmas,
+)
+from TodoApp.models import Todos
+
+USERS = 100
+
+
+def make_engine(path, profile, threads):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=threads,
+    )
+    apply_sqlite_pragmas(engine, sqlite_pragmas(profile))
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed(engine, count):
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Todos),
+            [
+                {
+                    "title": f"Todo {i}",
+                    "description": "Benchmark todo",
+                    "priority": i % 5 + 1,
+                    "complete": False,
+                    "owner_id": i % USERS + 1,
+                }
+                for i in range(count)
+            ],
+        )
+
+
+def worker(SessionLocal, write_ratio, deadline, seed, results):
+    rng = random.Random(seed)
+    reads, writes, errors = [], [], 0
+    while time.perf_counter() < deadline:
+        owner_id = rng.randrange(USERS) + 1
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                if rng.random() < write_ratio:
+                    db.add(
+                        Todos(
+                            title="New todo",
+                            description="Written by the benchmark",
+                            priority=3,
+                            complete=False,
+                            owner_id=owner_id,
+                        )
+                    )
+                    db.commit()
+                    writes.append(time.perf_counter() - started)
+                else:
+                    db.scalars(select(Todos).where(Todos.owner_id == owner_id)).all()
+                    reads.append(time.perf_counter() - started)
+        except OperationalError:
+            errors += 1
+    results.append((reads, writes, errors))
+
+
+def percentile(timings, fraction):
+    if not timings:
+        return float("nan")
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def run(profile, args):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(os.path.join(directory, "bench.db"), profile, args.threads)
+        seed(engine, args.todos)
+        SessionLocal = sessionmaker(bind=engine)
+        results = []
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(SessionLocal, args.write_ratio, deadline, i, results),
+            )
+            for i in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    reads = [t for r, _, _ in results for t in r]
+    writes = [t for _, w, _ in results for t in w]
+    errors = sum(e for _, _, e in results)
+    return {
+        "ops_per_s": (len(reads) + len(writes)) / args.seconds,
+        "reads_per_s": len(reads) / args.seconds,
+        "writes_per_s": len(writes) / args.seconds,
+        "read_p99_ms": percentile(reads, 0.99),
+        "write_p99_ms": percentile(writes, 0.99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES))
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--todos", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(
+        f"{args.threads} threads, {args.write_ratio:.0%} writes, "
+        f"{args.seconds:g}s per profile, {args.todos:,} todos"
+    )
+    print(
+        f"{'profile':<10}{'ops/s':>9}{'reads/s':>9}{'writes/s':>9}"
+        f"{'read p99 ms':>13}{'write p99 ms':>14}{'errors':>8}"
+    )
+    for profile in args.profiles:
+        stats = run(profile, args)
+        print(
+            f"{profile:<10}{stats['ops_per_s']:>9.0f}{stats['reads_per_s']:>9.0f}"
+            f"{stats['writes_per_s']:>9.0f}{stats['read_p99_ms']:>13.1f}"
+            f"{stats['write_p99_ms']:>14.1f}{stats['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cold start time for a journaled catalog: snapshot load plus journal replay.
+
+    python -m benchmarks.bench_cold_start --books 1000000 --tail 10000
+"""
+
+import argparse
+import tempfile
+import time
+
+from books2 import Book
+from bookstore import BookStore, ColumnarBookStore, Journal
+
+from .bench_memory import generate_books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="journal records after the snapshot")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = BookStore(generate_books(args.books))
+        store.restore(Journal(directory, "books2", snapshot_every=args.tail + 1))
+        started = time.perf_counter()
+        store.snapshot()
+        print(f"write snapshot: {time.perf_counter() - started:.2f}s")
+        for book_id in range(1, args.tail + 1):
+            store.update(Book(book_id, "Updated title", "Author", "Updated", 1, 2020))
+        store._journal.close()
+        del store
+
+        for store_type in (BookStore, ColumnarBookStore):
+            started = time.perf_counter()
+            restored = store_type(book_type=Book)
+            restored.restore(Journal(directory, "books2"))
+            elapsed = time.perf_counter() - started
+            assert len(restored) == args.books
+            print(f"cold start {store_type.__name__}: {elapsed:.2f}s")
+            del restored
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compound filter latency: NumPy boolean masks vs a per-book Python loop.
+
+Runs the same rating / year range / author set queries against
+``filter_books`` (the loop used when NumPy is missing) and ``BookStore.query``
+backed by the NumPy column mirror.
+
+    python -m benchmarks.bench_filter --books 1000000
+"""
+
+import argparse
+import time
+
+from bookstore import BookStore
+from bookstore.vectorized import filter_books, np
+
+from .bench_memory import generate_books
+
+QUERIES = {
+    "rating>=4": dict(min_rating=4),
+    "year 2010-2015": dict(year_from=2010, year_to=2015),
+    "rating>=3, 2005-2025, 3 authors": dict(
+        min_rating=3,
+        year_from=2005,
+        year_to=2025,
+        authors=["Author 2", "Author 23", "Author 304"],
+    ),
+}
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if np is None:
+        parser.error("NumPy is not installed")
+
+    store = BookStore(generate_books(args.books))
+    start = time.perf_counter()
+    store.query()
+    print(f"column mirror build: {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'query':<34}{'matches':>9}{'loop ms':>10}{'numpy ms':>10}{'speedup':>9}")
+    for name, predicates in QUERIES.items():
+        matches = len(store.query(**predicates))
+        loop = best_of(args.repeat, lambda: filter_books(store.all(), **predicates))
+        vectorized = best_of(args.repeat, lambda: store.query(**predicates))
+        print(
+            f"{name:<34}{matches:>9}{loop * 1000:>10.1f}"
+            f"{vectorized * 1000:>10.1f}{loop / vectorized:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Bytes per book for the in-memory catalog representations.
+
+Compares today's list of ``Book`` objects against BookStore (dict + indexes)
+and ColumnarBookStore (array columns + interned strings).
+
+    python -m benchmarks.bench_memory --books 200000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from books2 import Book
+from bookstore import BookStore, ColumnarBookStore
+
+
+def generate_books(count):
+    # f-strings build a fresh str per row, like parsing a JSON request body does.
+    for i in range(1, count + 1):
+        yield Book(
+            i,
+            f"Book title {i}",
+            f"Author {i % 1000}",
+            f"Description for category {i % 50}",
+            i % 5 + 1,
+            2000 + i % 31,
+        )
+
+
+REPRESENTATIONS = {
+    "list[Book]": lambda count: list(generate_books(count)),
+    "BookStore": lambda count: BookStore(generate_books(count)),
+    "ColumnarBookStore": lambda count: ColumnarBookStore(generate_books(count)),
+}
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    catalog = build(count)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=200_000)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'representation':<20}{'bytes/book':>12}{'vs list':>10}")
+    for name, build in REPRESENTATIONS.items():
+        per_book = measure(build, args.books) / args.books
+        baseline = baseline or per_book
+        print(f"{name:<20}{per_book:>12.1f}{per_book / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
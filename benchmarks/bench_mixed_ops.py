@@ -0,0 +1,117 @@
+"""Throughput of mixed create/update/delete operations on the book catalog.
+
+Replays the same random sequence of operations against the old list-based
+code path (linear search + ``list.pop``), BookStore and ColumnarBookStore.
+
+    python -m benchmarks.bench_mixed_ops --ops 100000 --initial 20000
+"""
+
+import argparse
+import random
+import time
+
+from books2 import Book
+from bookstore import BookStore, ColumnarBookStore
+
+
+def make_book(book_id, rng):
+    return Book(
+        book_id,
+        f"Book title {book_id}",
+        f"Author {rng.randrange(1000)}",
+        "Book Description",
+        rng.randint(1, 5),
+        rng.randint(2000, 2030),
+    )
+
+
+def make_ops(count, initial, seed):
+    rng = random.Random(seed)
+    live = list(range(1, initial + 1))
+    next_id = initial + 1
+    ops = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4 or not live:
+            ops.append(("create", make_book(next_id, rng)))
+            live.append(next_id)
+            next_id += 1
+        elif roll < 0.7:
+            ops.append(("update", make_book(rng.choice(live), rng)))
+        else:
+            ops.append(("delete", live.pop(rng.randrange(len(live)))))
+    return ops
+
+
+class ListCatalog:
+    # The pre-BookStore code path from books2.py, kept here as the baseline.
+
+    def __init__(self, books):
+        self.books = list(books)
+
+    def add(self, book):
+        self.books.append(book)
+
+    def update(self, book):
+        for i in range(len(self.books)):
+            if self.books[i].id == book.id:
+                self.books[i] = book
+                return book
+
+    def delete(self, book_id):
+        for i in range(len(self.books)):
+            if self.books[i].id == book_id:
+                return self.books.pop(i)
+
+    def all(self):
+        return self.books
+
+
+CATALOGS = {
+    "list (old)": ListCatalog,
+    "BookStore": BookStore,
+    "ColumnarBookStore": ColumnarBookStore,
+}
+
+
+def run(catalog_type, initial_books, ops):
+    catalog = catalog_type(initial_books)
+    started = time.perf_counter()
+    for op, arg in ops:
+        if op == "create":
+            catalog.add(arg)
+        elif op == "update":
+            catalog.update(arg)
+        else:
+            catalog.delete(arg)
+    elapsed = time.perf_counter() - started
+    ids = [book.id for book in catalog.all()]
+    return elapsed, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--initial", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-list", action="store_true", help="skip the O(n) baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    initial_books = [make_book(i, rng) for i in range(1, args.initial + 1)]
+    ops = make_ops(args.ops, args.initial, args.seed)
+
+    expected = None
+    print(f"{'catalog':<20}{'seconds':>10}{'ops/s':>14}")
+    for name, catalog_type in CATALOGS.items():
+        if args.skip_list and catalog_type is ListCatalog:
+            continue
+        elapsed, ids = run(catalog_type, initial_books, ops)
+        # Every implementation must end with the same books in the same order.
+        expected = expected or ids
+        assert ids == expected, f"{name} iteration order diverged"
+        print(f"{name:<20}{elapsed:>10.3f}{len(ops) / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""Latency of the book apps' core operations as the catalog grows.
+
+Seeds main.py, books2.py and books.py with 10k / 100k / 1M books and times
+lookup by id (title for books.py), filters by rating / year / author
+(category for books.py), create, update, delete and listing, both by
+calling the catalog directly and through each FastAPI app in-process over
+ASGI. Results go to a JSON report; pass an older report as ``--baseline`` to
+print how each number moved.
+
+    python -m benchmarks.bench_suite --sizes 10000 100000 1000000 --output report.json
+    python -m benchmarks.bench_suite --sizes 10000 --baseline report.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+import httpx
+
+import books
+import books2
+import main as books_main
+from bookstore import BookCatalog, BookStore
+
+
+def make_book(book_type, i, rating=None):
+    return book_type(
+        i,
+        f"Book title {i}",
+        f"Author {i % 1000}",
+        "Book Description",
+        rating or i % 5 + 1,
+        2000 + i % 31,
+    )
+
+
+def make_dict_book(i, category=None):
+    return {
+        "title": f"Title {i}",
+        "author": f"Author {i % 1000}",
+        "category": category or f"category {i % 500}",
+    }
+
+
+def book_json(i, rating=3):
+    return {
+        "id": i,
+        "title": f"Book title {i}",
+        "author": f"Author {i % 1000}",
+        "description": "Book Description",
+        "rating": rating,
+        "published_year": 2000 + i % 31,
+    }
+
+
+class Live:
+    # Ids (or titles) still in the catalog, so updates and deletes always hit.
+
+    def __init__(self, keys, rng):
+        self.keys = list(keys)
+        self.rng = rng
+
+    def pick(self):
+        return self.keys[self.rng.randrange(len(self.keys))]
+
+    def pop(self):
+        i = self.rng.randrange(len(self.keys))
+        self.keys[i], self.keys[-1] = self.keys[-1], self.keys[i]
+        return self.keys.pop()
+
+
+def store_scenario(module, size, rng):
+    # main.py and books2.py share BookStore; only their routes differ.
+    book_type = module.Book
+    store = BookStore(make_book(book_type, i) for i in range(1, size + 1))
+    live = Live(range(1, size + 1), rng)
+    is_books2 = module is books2
+
+    def create():
+        store.add(make_book(book_type, store.next_id()))
+
+    functions = {
+        "lookup": lambda: store.get(live.pick()),
+        "filter_rating": lambda: store.by_rating(rng.randint(1, 5)),
+        "filter_year": lambda: store.by_year(rng.randint(2000, 2030)),
+        "filter_author": lambda: store.query(authors=[f"Author {rng.randrange(1000)}"]),
+        "list_all": store.all,
+        "create": create,
+        "update": lambda: store.update(make_book(book_type, live.pick(), rating=4)),
+        "delete": lambda: store.delete(live.pop()),
+    }
+    requests = {
+        "lookup": lambda: ("GET", f"/books/{live.pick()}", {}),
+        "filter_rating": lambda: (
+            "GET",
+            "/books/",
+            {"params": {"rating": rng.randint(1, 5)}},
+        ),
+        "filter_year": lambda: (
+            "GET",
+            "/books/pubyear",
+            {"params": {"pubyear": rng.randint(2000, 2030)}},
+        ),
+        "list_page": lambda: ("GET", "/books", {"params": {"limit": 100}}),
+        "create": lambda: (
+            "POST",
+            "/books/" if is_books2 else "/books/create_book",
+            {"json": book_json(0)},
+        ),
+        "update": lambda: (
+            "PUT",
+            "/books/" if is_books2 else "/books/update_book",
+            {"json": book_json(live.pick(), rating=2)},
+        ),
+    }
+    if is_books2:
+        requests["filter_author"] = lambda: (
+            "GET",
+            "/books/query",
+            {"params": {"author": f"Author {rng.randrange(1000)}"}},
+        )
+        requests["delete"] = lambda: ("DELETE", f"/books/{live.pop()}", {})
+    else:
+        requests["delete"] = lambda: (
+            "DELETE",
+            "/books/delete_book",
+            {"params": {"book_id": live.pop()}},
+        )
+    return store, functions, requests
+
+
+def catalog_scenario(module, size, rng):
+    catalog = BookCatalog(make_dict_book(i) for i in range(1, size + 1))
+    live = Live((f"Title {i}" for i in range(1, size + 1)), rng)
+    counter = iter(range(size + 1, 10 * size + 2))
+
+    functions = {
+        "lookup": lambda: catalog.find_title(live.pick()),
+        "filter_category": lambda: catalog.by_category(
+            f"category {rng.randrange(500)}"
+        ),
+        "filter_author": lambda: catalog.by_author(f"Author {rng.randrange(1000)}"),
+        "list_all": catalog.all,
+        "create": lambda: catalog.add(make_dict_book(next(counter))),
+        "update": lambda: catalog.update(
+            {"title": live.pick(), "author": "Author 1", "category": "category 1"}
+        ),
+        "delete": lambda: catalog.delete(live.pop()),
+    }
+    requests = {
+        "lookup": lambda: ("GET", "/books", {"params": {"book_title": live.pick()}}),
+        "filter_category": lambda: ("GET", f"/books/category {rng.randrange(500)}", {}),
+        "filter_author": lambda: (
+            "GET",
+            "/books/byauthor/",
+            {"params": {"author": f"Author {rng.randrange(1000)}"}},
+        ),
+        "list_page": lambda: ("GET", "/bookstore", {"params": {"limit": 100}}),
+        "create": lambda: (
+            "POST",
+            "/books/create_book",
+            {"json": make_dict_book(next(counter))},
+        ),
+        "update": lambda: (
+            "PUT",
+            "/books/update_book",
+            {"json": {"title": live.pick(), "author": "Author 2", "category": "math"}},
+        ),
+        "delete": lambda: (
+            "DELETE",
+            "/books/delete_book",
+            {"json": {"title": live.pop()}},
+        ),
+    }
+    return catalog, functions, requests
+
+
+APPS = {
+    "main": (books_main, store_scenario),
+    "books2": (books2, store_scenario),
+    "books": (books, catalog_scenario),
+}
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "iterations": len(timings),
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p50_us": timings[len(timings) // 2] * 1e6,
+        "p99_us": timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6,
+    }
+
+
+def time_functions(functions, iterations):
+    results = {}
+    for name, fn in functions.items():
+        count = 5 if name == "list_all" else iterations
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        results[name] = summarize(timings)
+    return results
+
+
+async def time_requests(app, requests, iterations):
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for name, make_request in requests.items():
+            timings = []
+            for _ in range(iterations):
+                method, url, kwargs = make_request()
+                started = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                timings.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{method} {url}: HTTP {response.status_code}")
+            results[name] = summarize(timings)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(apps, sizes, iterations, asgi_iterations, seed):
+    results = []
+    for size in sizes:
+        for app_name in apps:
+            module, scenario = APPS[app_name]
+            rng = random.Random(seed)
+            started = time.perf_counter()
+            store, functions, requests = scenario(module, size, rng)
+            seed_seconds = time.perf_counter() - started
+            print(f"{app_name} @ {size:,} books (seeded in {seed_seconds:.1f}s)")
+            layers = {"function": time_functions(functions, iterations)}
+            original = module.books
+            module.books = store
+            try:
+                layers["asgi"] = asyncio.run(
+                    time_requests(module.app, requests, asgi_iterations)
+                )
+            finally:
+                module.books = original
+            for layer, operations in layers.items():
+                for operation, stats in operations.items():
+                    results.append(
+                        {
+                            "app": app_name,
+                            "size": size,
+                            "layer": layer,
+                            "operation": operation,
+                            **stats,
+                        }
+                    )
+                    print(
+                        f"  {layer:<9}{operation:<16}{stats['mean_us']:>12.1f} us mean"
+                        f"{stats['p99_us']:>12.1f} us p99"
+                    )
+            del store, functions, requests
+            gc.collect()
+    return results
+
+
+def compare(results, baseline):
+    key = lambda row: (row["app"], row["size"], row["layer"], row["operation"])
+    previous = {key(row): row for row in baseline["results"]}
+    print(f"\nvs baseline {baseline.get('commit') or '?'} (mean, >1.00x is slower)")
+    matched = [(row, previous.get(key(row))) for row in results]
+    if not any(old for _, old in matched):
+        print("  no operations in common (different sizes or apps?)")
+    for row, old in matched:
+        if old:
+            ratio = row["mean_us"] / old["mean_us"]
+            flag = "  <-- regression" if ratio > 1.2 else ""
+            print(f"  {' '.join(map(str, key(row))):<48}{ratio:>7.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--apps", nargs="+", choices=sorted(APPS), default=list(APPS))
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--asgi-iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    results = run(
+        args.apps, args.sizes, args.iterations, args.asgi_iterations, args.seed
+    )
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
-from fastapi import Body, FastAPI
+from typing import Optional
+
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+
+from bookstore import create_catalog
+from bookstore.responses import ndjson_response, paginate, wants_ndjson
 
 app = FastAPI()
 
 
-books = [
-    {"title": "Title One", "author": "Author One", "category": "science"},
-    {"title": "Title Two", "author": "Author Two", "category": "science"},
-    {"title": "Title Three", "author": "Author Three", "category": "history"},
-    {"title": "Title Four", "author": "Author Four", "category": "math"},
-    {"title": "Title Five", "author": "Author Five", "category": "math"},
-    {"title": "Title Six", "author": "Author Two", "category": "math"},
-]
+books = create_catalog(
+    [
+        {"title": "Title One", "author": "Author One", "category": "science"},
+        {"title": "Title Two", "author": "Author Two", "category": "science"},
+        {"title": "Title Three", "author": "Author Three", "category": "history"},
+        {"title": "Title Four", "author": "Author Four", "category": "math"},
+        {"title": "Title Five", "author": "Author Five", "category": "math"},
+        {"title": "Title Six", "author": "Author Two", "category": "math"},
+    ],
+    name="books",
+)
 
 
 # GET Request
@@ -21,9 +29,20 @@ async def home_page():
 
 
 # Static Path Parameter
+# Pagination: pass limit (and the cursor from the Link header) to page through the catalog.
+# Streaming: send "Accept: application/x-ndjson" to get one book per line in chunks.
 @app.get("/bookstore")
-async def get_all_books():
-    return books
+async def get_all_books(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(default=None, gt=0, le=1000),
+    cursor: Optional[int] = Query(default=None, gt=0),
+):
+    if wants_ndjson(request):
+        return ndjson_response(books, after=cursor)
+    if limit is None and cursor is None:
+        return books.all()
+    return paginate(request, response, books, limit, cursor)
 
 
 # Order of Path Parameters is important
@@ -37,47 +56,45 @@ async def my_book():
 async def get_book_details(
     book_title: str,
 ):  # book_title is a query parameter for the path /books
-    for book in books:
-        if book.get("title").casefold() == book_title.casefold():
-            return book
-    else:
-        return {"message": f"{book_title} book details not found"}
+    book = books.find_title(book_title)
+    if book is not None:
+        return book
+    return {"message": f"{book_title} book details not found"}
 
 
 # IMP:  **Endpoint Overlap:**  The `/books/{category}` endpoint could potentially catch `/books/authorcat` if not defined above it. So you should be defining here not below '/books/{category}'. Or if you want to define it below `/books/{category}`, you need to add a trailing slash `/` to the `/books/authorcat` endpoint to avoid overlap i.e. `/books/{category}`. Note that this rule is applicable to other CRUD operations as well not just GET requests.
 # Using Query Parameters
 @app.get("/books/authorcat")
 async def get_book_by_author_category(author: str, category: str):
-    books_to_return = []
-    for book in books:
-        if (
-            book.get("author").casefold() == author.casefold()
-            and book.get("category").casefold() == category.casefold()
-        ):
-            books_to_return.append(book)
-    return books_to_return
+    return books.by_author_category(author, category)
+
+
+# Book counts per category and per author (defined above /books/{category})
+@app.get("/books/facets")
+async def get_book_facets():
+    return books.facets()
+
+
+# Typo-tolerant title search, most similar titles first (defined above /books/{category})
+@app.get("/books/fuzzy")
+async def get_books_by_fuzzy_title(
+    title: str, limit: int = Query(default=10, gt=0, le=100)
+):
+    return books.fuzzy_title(title, limit)
 
 
 # Dynamic Path Parameter
 @app.get("/books/{category}")
 # IMP: One thing that we need to note is that the API endpoint dynamic param (category) that's in curly brackets above needs to match the naming convention that we have as our parameter in our book_by_category function.
 async def book_by_category(category: str):  # category is a dynamic path parameter
-    books_to_return = []
-    for book in books:
-        if book.get("category").casefold() == category.casefold():
-            books_to_return.append(book)
-    return books_to_return
+    return books.by_category(category)
 
 
 # Using Query Parameters
 # It will not work if you are not adding `/` after `/books/byauthor` due to the endpoint overlap with `/books/{category}`, if you want to make it work just with `/books/byauthor` you just need to add it above `/books/{category}` endpoint. Note that this rule is applicable to other CRUD operations as well not just GET requests.
 @app.get("/books/byauthor/")
 async def books_by_author(author: str):
-    books_to_return = []
-    for book in books:
-        if book.get("author").casefold() == author.casefold():
-            books_to_return.append(book)
-    return books_to_return
+    return books.by_author(author)
 
 
 # IMP: You can't have two dynamic path parameters or endpoints with the same path (/books). Below will not work. Note that this rule is applicable to other CRUD operations as well not just GET requests.
@@ -105,7 +122,10 @@ async def books_by_author(author: str):
 # {"title": "Title Seven", "author": "Sandeep", "category": "Python"}
 @app.post("/books/create_book")
 async def create_book(new_book=Body()):
-    books.append(new_book)
+    try:
+        books.add(new_book)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
     return {"message": "Book created successfully", "book": new_book}
 
 
@@ -113,21 +133,22 @@ async def create_book(new_book=Body()):
 # {"title": "Title Seven", "author": "Sandeep", "category": "Advanced Python"}
 @app.put("/books/update_book")
 async def update_book(new_book=Body()):
-    for index in range(len(books)):
-        if books[index].get("title").casefold() == new_book.get("title").casefold():
-            books[index] = new_book
-            return {"message": "Book updated successfully"}
-    else:
-        return {"message": "Book not found for update"}
+    try:
+        updated = books.update(new_book)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if updated is not None:
+        return {"message": "Book updated successfully"}
+    return {"message": "Book not found for update"}
 
 
 # DELETE Request
 # {"title": "Title Seven"}
 @app.delete("/books/delete_book")
 async def delete_book(new_book=Body()):
-    for index, book in enumerate(books):
-        if book.get("title").casefold() == new_book.get("title").casefold():
-            del books[index]
-            return {"message": "Book deleted successfully"}
-    else:
-        return {"message": "Book not found for deletion"}
+    title = new_book.get("title") if isinstance(new_book, dict) else None
+    if not isinstance(title, str):
+        raise HTTPException(status_code=422, detail="A book needs a text title")
+    if books.delete(title) is not None:
+        return {"message": "Book deleted successfully"}
+    return {"message": "Book not found for deletion"}
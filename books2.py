@@ -1,9 +1,38 @@
-from typing import Optional
+from typing import Any, Literal, Optional
 
-from fastapi import FastAPI, HTTPException, Path, Query
+from fastapi import (
+    Body,
+    FastAPI,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from pydantic import BaseModel, Field
 from starlette import status
 
+from bookstore import create_store
+from bookstore.bulk import (
+    MAX_REPORTED_ERRORS,
+    UploadError,
+    iter_batches,
+    iter_upload,
+    validate_batch,
+)
+from bookstore.responses import (
+    ResponseCache,
+    book_etag,
+    catalog_etag,
+    etag_matches,
+    export_response,
+    ndjson_response,
+    not_modified,
+    paginate_snapshot,
+    wants_ndjson,
+)
+
 app = FastAPI()
 
 
@@ -49,14 +78,22 @@ class BookRequest(BaseModel):
     }
 
 
-books = [
-    Book(1, "Computer Science Pro", "codingwithroby", "A very nice book!", 5, 2030),
-    Book(2, "Be Fast with FastAPI", "codingwithroby", "A great book!", 5, 2030),
-    Book(3, "Master Endpoints", "codingwithroby", "A awesome book!", 5, 2029),
-    Book(4, "HP1", "Author 1", "Book Description", 2, 2028),
-    Book(5, "HP2", "Author 2", "Book Description", 3, 2027),
-    Book(6, "HP3", "Author 3", "Book Description", 1, 2026),
-]
+books = create_store(
+    [
+        Book(1, "Computer Science Pro", "codingwithroby", "A very nice book!", 5, 2030),
+        Book(2, "Be Fast with FastAPI", "codingwithroby", "A great book!", 5, 2030),
+        Book(3, "Master Endpoints", "codingwithroby", "A awesome book!", 5, 2029),
+        Book(4, "HP1", "Author 1", "Book Description", 2, 2028),
+        Book(5, "HP2", "Author 2", "Book Description", 3, 2027),
+        Book(6, "HP3", "Author 3", "Book Description", 1, 2026),
+    ],
+    name="books2",
+    book_type=Book,
+)
+
+
+# Encoded JSON for the catalog reads below, reused until the next write bumps books.version
+response_cache = ResponseCache()
 
 
 # GET Request
@@ -67,29 +104,110 @@ async def home_page():
 
 
 # Static Path Parameter
+# Pagination: pass limit (and the cursor from the Link header) to page through the catalog.
+# The Link header also pins the catalog version (snapshot), so later pages ignore newer writes.
+# Streaming: send "Accept: application/x-ndjson" to get one book per line in chunks.
 @app.get("/books", status_code=status.HTTP_200_OK)
-async def get_books():
-    return books
+async def get_books(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(default=None, gt=0, le=1000),
+    cursor: Optional[int] = Query(default=None, gt=0),
+    snapshot: Optional[int] = Query(default=None, ge=0),
+):
+    if wants_ndjson(request):
+        return ndjson_response(books, after=cursor)
+    if limit is None and cursor is None:
+        # Clients that already hold the current catalog version get a bodiless 304
+        etag = catalog_etag(books)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        cached_response = response_cache.response(books, "all", books.all)
+        cached_response.headers["ETag"] = etag
+        return cached_response
+    # Pages carry the ETag of the snapshot they were read from.
+    return paginate_snapshot(request, response, books, limit, cursor, snapshot)
 
 
 # IMP: Always keep the static path parameter above the dynamic path parameter
 # Query Parameter
 @app.get("/books/pubyear", status_code=status.HTTP_200_OK)
 async def read_by_year(pubyear: int = Query(gt=1999, lt=2031)):
-    books_to_return = []
-    for book in books:
-        print(type(pubyear))
-        if book.published_year == pubyear:
-            books_to_return.append(book)
-    return books_to_return
+    return response_cache.response(
+        books, ("pubyear", pubyear), lambda: books.by_year(pubyear)
+    )
+
+
+# Range query over published year and rating, bounds inclusive and each optional
+@app.get("/books/range", status_code=status.HTTP_200_OK)
+async def read_by_range(
+    year_from: Optional[int] = Query(default=None, gt=1999, lt=2031),
+    year_to: Optional[int] = Query(default=None, gt=1999, lt=2031),
+    min_rating: Optional[int] = Query(default=None, gt=0, lt=6),
+    max_rating: Optional[int] = Query(default=None, gt=0, lt=6),
+):
+    bounds = (year_from, year_to, min_rating, max_rating)
+    return response_cache.response(
+        books, ("range", bounds), lambda: books.in_range(*bounds)
+    )
+
+
+# Compound filter: every given predicate must match, author may be repeated
+@app.get("/books/query", status_code=status.HTTP_200_OK)
+async def query_books(
+    min_rating: Optional[int] = Query(default=None, gt=0, lt=6),
+    max_rating: Optional[int] = Query(default=None, gt=0, lt=6),
+    year_from: Optional[int] = Query(default=None, gt=1999, lt=2031),
+    year_to: Optional[int] = Query(default=None, gt=1999, lt=2031),
+    author: Optional[list[str]] = Query(default=None),
+):
+    predicates = (min_rating, max_rating, year_from, year_to, author)
+    return response_cache.response(
+        books,
+        ("query", *predicates[:4], author and tuple(author)),
+        lambda: books.query(*predicates),
+    )
+
+
+# Best k books by rating, optionally for one author and/or year (ties: oldest id first)
+@app.get("/books/top", status_code=status.HTTP_200_OK)
+async def read_top_books(
+    k: int = Query(default=10, gt=0, le=100),
+    author: Optional[str] = Query(default=None, min_length=1),
+    year: Optional[int] = Query(default=None, gt=1999, lt=2031),
+):
+    return response_cache.response(
+        books, ("top", k, author, year), lambda: books.top(k, author, year)
+    )
+
+
+# Streaming export of the whole catalog as a CSV or NDJSON download, read from one snapshot
+@app.get("/books/export", status_code=status.HTTP_200_OK)
+async def export_books(
+    file_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format")
+):
+    return export_response(books, file_format, "books")
+
+
+# Full-text search over title, author and description, ranked by relevance (BM25)
+@app.get("/books/search", status_code=status.HTTP_200_OK)
+async def search_books(
+    q: str = Query(min_length=1), limit: int = Query(default=10, gt=0, le=100)
+):
+    return books.search(q, limit)
 
 
 # Dynamic Path Parameter. Data Validation of Path.
 @app.get("/books/{book_id}", status_code=status.HTTP_200_OK)
-async def read_by_bookid(book_id: int = Path(gt=0)):
-    for book in books:
-        if book.id == book_id:
-            return book
+async def read_by_bookid(
+    request: Request, response: Response, book_id: int = Path(gt=0)
+):
+    etag = book_etag(books, book_id)
+    if etag is not None:
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return books.get(book_id)
     # return {"message": f"Book with ID {book_id} not found"}
     raise HTTPException(status_code=404, detail="Book not found")
 
@@ -98,11 +216,9 @@ async def read_by_bookid(book_id: int = Path(gt=0)):
 # Query Parameter
 @app.get("/books/", status_code=status.HTTP_200_OK)
 async def read_by_rating(rating: int = Query(gt=0, lt=6)):
-    books_to_return = []
-    for book in books:
-        if book.rating == rating:
-            books_to_return.append(book)
-    return books_to_return
+    return response_cache.response(
+        books, ("rating", rating), lambda: books.by_rating(rating)
+    )
 
 
 # POST Request
@@ -111,13 +227,79 @@ async def read_by_rating(rating: int = Query(gt=0, lt=6)):
 async def create_book(book_request: BookRequest):
     book_request.id = generate_book_id()
     new_book = Book(**book_request.model_dump())
-    books.append(new_book)
+    books.add(new_book)
     return {"message": "Book created successfully", "book": new_book}
 
 
 def generate_book_id():
-    book_id = 1 if len(books) == 0 else books[-1].id + 1
-    return book_id
+    return books.next_id()
+
+
+# Bulk POST Request: validates the whole list in one pass and reports errors per item,
+# so one bad book doesn't reject the rest of the batch.
+@app.post("/books/bulk", status_code=status.HTTP_201_CREATED)
+async def create_books_bulk(book_requests: list[Any] = Body(max_length=10_000)):
+    valid, errors = validate_batch(BookRequest, book_requests)
+    book_ids = books.allocate_ids(len(valid))
+    new_books = [
+        Book(**book_request.model_dump(exclude={"id"}), id=book_id)
+        for (_, book_request), book_id in zip(valid, book_ids)
+    ]
+    books.add_many(new_books)
+    return {
+        "message": f"{len(new_books)} books created",
+        "books": new_books,
+        "errors": errors,
+    }
+
+
+# Streaming import of an uploaded CSV (header row required) or NDJSON file. Rows are
+# validated and inserted one chunk at a time, so memory stays flat however big the
+# file is; bad rows are reported by index and skipped. A plain def runs in the
+# threadpool, so parsing a large file doesn't block the event loop.
+@app.post("/books/import", status_code=status.HTTP_201_CREATED)
+def import_books(
+    file: UploadFile,
+    file_format: Optional[Literal["ndjson", "csv"]] = Query(
+        default=None, alias="format"
+    ),
+):
+    if file_format is None:
+        file_format = "csv" if (file.filename or "").endswith(".csv") else "ndjson"
+    imported = 0
+    error_count = 0
+    errors = []
+    try:
+        for book_requests, batch_errors in iter_batches(
+            BookRequest, iter_upload(file.file, file_format)
+        ):
+            book_ids = books.allocate_ids(len(book_requests))
+            books.add_many(
+                [
+                    Book(**book_request.model_dump(exclude={"id"}), id=book_id)
+                    for book_request, book_id in zip(book_requests, book_ids)
+                ]
+            )
+            imported += len(book_requests)
+            error_count += len(batch_errors)
+            errors.extend(batch_errors[: MAX_REPORTED_ERRORS - len(errors)])
+    except UploadError as exc:
+        # Batches before the unreadable spot are already in the catalog.
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": str(exc),
+                "imported": imported,
+                "error_count": error_count,
+                "errors": errors,
+            },
+        )
+    return {
+        "message": f"{imported} books imported",
+        "imported": imported,
+        "error_count": error_count,
+        "errors": errors,
+    }
 
 
 # PUT Request
@@ -125,22 +307,15 @@ def generate_book_id():
 @app.put("/books/", status_code=status.HTTP_204_NO_CONTENT)
 async def update_book(book_request: BookRequest):
     upd_book = Book(**book_request.model_dump())
-    book_changed = False
-    for i in range(len(books)):
-        if books[i].id == upd_book.id:
-            books[i] = upd_book
-            book_changed = True
-            # raise HTTPException(status_code=204, detail="Book updated successfully")
-            return {"message": "Book updated successfully", "book": books[i]}
-    if not book_changed:
-        raise HTTPException(status_code=404, detail="Book not found")
+    if books.update(upd_book) is not None:
+        # raise HTTPException(status_code=204, detail="Book updated successfully")
+        return {"message": "Book updated successfully", "book": upd_book}
+    raise HTTPException(status_code=404, detail="Book not found")
 
 
 # DELETE Request - Query Parameter
 @app.delete("/books/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(book_id: int = Path(gt=0)):
-    for i in range(len(books)):
-        if books[i].id == book_id:
-            books.pop(i)
-            return {"message": f"Book with ID {book_id} deleted successfully"}
+    if books.delete(book_id) is not None:
+        return {"message": f"Book with ID {book_id} deleted successfully"}
     raise HTTPException(status_code=404, detail="Book not found")
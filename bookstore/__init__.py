@@ -0,0 +1,20 @@
+from .catalog import BookCatalog
+from .columnar import ColumnarBookStore
+from .factory import create_catalog, create_store
+from .indexes import HashIndex, RangeIndex
+from .journal import Journal
+from .shared import SharedBookStore, SharedColumnarBookStore
+from .store import BookStore
+
+__all__ = [
+    "BookCatalog",
+    "BookStore",
+    "ColumnarBookStore",
+    "HashIndex",
+    "Journal",
+    "RangeIndex",
+    "SharedBookStore",
+    "SharedColumnarBookStore",
+    "create_catalog",
+    "create_store",
+]
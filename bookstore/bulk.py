@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from functools import lru_cache
+from itertools import islice
+
+from pydantic import TypeAdapter, ValidationError
+
+# Rows validated and inserted per batch by a streaming import.
+IMPORT_CHUNK_SIZE = 1000
+# An import keeps reporting errors up to this many, then only counts them.
+MAX_REPORTED_ERRORS = 1000
+
+
+class UploadError(ValueError):
+    """An upload that can't be read as text in its declared format."""
+
+
+@lru_cache
+def _list_adapter(model):
+    return TypeAdapter(list[model])
+
+
+def validate_batch(model, items):
+    """Validate a list of raw items against ``model`` in one pass.
+
+    Returns ``(valid, errors)``: ``valid`` is a list of ``(index, instance)``
+    pairs and ``errors`` a list of ``{"index": i, "errors": [...]}`` entries, so
+    one bad item doesn't reject the rest of the batch. Only when something fails
+    are the remaining items validated a second time.
+    """
+    adapter = _list_adapter(model)
+    try:
+        return list(enumerate(adapter.validate_python(items))), []
+    except ValidationError as exc:
+        failed = {}
+        for error in exc.errors(
+            include_url=False, include_context=False, include_input=False
+        ):
+            index, *loc = error["loc"]
+            failed.setdefault(index, []).append(
+                {"loc": loc, "msg": error["msg"], "type": error["type"]}
+            )
+    indexes = [i for i in range(len(items)) if i not in failed]
+    instances = adapter.validate_python([items[i] for i in indexes])
+    errors = [{"index": i, "errors": failed[i]} for i in sorted(failed)]
+    return list(zip(indexes, instances)), errors
+
+
+def iter_upload(file, file_format):
+    """Yield the raw records of an uploaded CSV (with a header row) or NDJSON file.
+
+    The file is read line by line, never as a whole. ``id`` is dropped since an
+    import always gets fresh ids; unparseable NDJSON lines come out as None so
+    validation reports them like any other bad row. A file that isn't UTF-8, or
+    CSV the reader can't split into fields, raises UploadError once the records
+    before the bad spot have been yielded.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    count = 0
+    try:
+        if file_format == "csv":
+            records = csv.DictReader(text)
+        else:
+            records = (_parse_json(line) for line in text if line.strip())
+        for record in records:
+            if isinstance(record, dict):
+                record.pop("id", None)
+            yield record
+            count += 1
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise UploadError(f"Unreadable upload after record {count}: {exc}") from exc
+    finally:
+        # Leave the upload itself open; its owner closes it.
+        text.detach()
+
+
+def iter_batches(model, records, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate ``records`` ``chunk_size`` at a time.
+
+    Yields ``(instances, errors)`` per chunk, with error indexes counted from
+    the start of the stream rather than the chunk.
+    """
+    records = iter(records)
+    start = 0
+    while chunk := list(islice(records, chunk_size)):
+        valid, errors = validate_batch(model, chunk)
+        for error in errors:
+            error["index"] += start
+        yield [instance for _, instance in valid], errors
+        start += len(chunk)
+
+
+def _parse_json(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
@@ -0,0 +1,205 @@
+import threading
+from operator import itemgetter
+
+from .indexes import HashIndex
+from .journal import PUT
+from .pagination import KeyOrder
+from .search import TrigramIndex
+
+
+class BookCatalog:
+    """Dict-based book catalog used by ``books.py``.
+
+    Books are plain dicts with ``title``, ``author`` and ``category``. Each one
+    gets an internal sequence number (title is not unique), and its casefolded
+    fields are computed once on insert and kept next to it, so lookups hit a
+    prebuilt index instead of casefolding every book on every request.
+
+    Like BookStore, writes go through a lock and can be logged to a Journal.
+    ``add`` and ``update`` raise ValueError for a book without a text title,
+    author and category, and leave the catalog untouched.
+    """
+
+    def __init__(self, books=()):
+        self._books = {}
+        self._keys = {}
+        self._next_seq = 1
+        self._title_index = HashIndex(itemgetter(0))
+        self._author_index = HashIndex(itemgetter(1))
+        self._category_index = HashIndex(itemgetter(2))
+        self._author_category_index = HashIndex(itemgetter(1, 2))
+        self._title_trigrams = TrigramIndex(itemgetter(0))
+        self._indexes = [
+            self._title_index,
+            self._author_index,
+            self._category_index,
+            self._author_category_index,
+            self._title_trigrams,
+        ]
+        self._order = KeyOrder(self._books.__contains__)
+        self._lock = threading.RLock()
+        self._journal = None
+        for book in books:
+            self.add(book)
+
+    def __len__(self):
+        return len(self._books)
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def all(self):
+        return list(self._books.values())
+
+    def page(self, after=None, limit=100):
+        # Keyset pagination over the internal sequence numbers: returns (books, next_cursor).
+        return self._order.page(self._books.get, after, limit)
+
+    def find_title(self, title):
+        seq = self._title_index.first(title.casefold())
+        return None if seq is None else self._books[seq]
+
+    def fuzzy_title(self, title, limit=10):
+        # Near-miss title lookup ("titel two" finds "Title Two"), most similar first.
+        matches = self._title_trigrams.search(title.casefold(), limit)
+        return [self._books[seq] for seq, _ in matches]
+
+    def by_author(self, author):
+        return self._lookup(self._author_index, author.casefold())
+
+    def by_category(self, category):
+        return self._lookup(self._category_index, category.casefold())
+
+    def by_author_category(self, author, category):
+        return self._lookup(
+            self._author_category_index, (author.casefold(), category.casefold())
+        )
+
+    def facets(self):
+        """Number of books per category and per author.
+
+        Lookups are case-insensitive, so each count is labelled with the
+        spelling of the book that has been in it longest. Cost is one pass
+        over the distinct categories and authors, not over the books.
+        """
+        return {
+            "category": self._facet(self._category_index, "category"),
+            "author": self._facet(self._author_index, "author"),
+        }
+
+    def add(self, book):
+        with self._lock:
+            seq = self._next_seq
+            self._insert(seq, book)
+            self._log_put(seq, book)
+            return book
+
+    def update(self, book):
+        # Replaces the first book with the same title, keeping its position.
+        with self._lock:
+            keys = self._normalize(book)
+            seq = self._title_index.first(keys[0])
+            if seq is None:
+                return None
+            self._replace(seq, book, keys)
+            self._log_put(seq, book)
+            return book
+
+    def delete(self, title):
+        with self._lock:
+            seq = self._title_index.first(title.casefold())
+            if seq is None:
+                return None
+            book = self._remove(seq)
+            self._log_delete(seq)
+            return book
+
+    def restore(self, journal):
+        """Replay ``journal``'s snapshot and tail into the catalog, then log new writes to it."""
+        with self._lock:
+            for op, seq, book in journal.load():
+                if op == PUT:
+                    if seq in self._books:
+                        self._replace(seq, book, self._normalize(book))
+                    else:
+                        self._insert(seq, book)
+                elif seq in self._books:
+                    self._remove(seq)
+            if journal.next_key is not None:
+                self._next_seq = max(self._next_seq, journal.next_key)
+            self._journal = journal
+
+    def snapshot(self):
+        with self._lock:
+            self._journal.write_snapshot(self._books.items(), next_key=self._next_seq)
+
+    def _insert(self, seq, book):
+        # Normalize first: a malformed book must not leave anything behind.
+        keys = self._normalize(book)
+        self._next_seq = max(self._next_seq, seq + 1)
+        self._books[seq] = book
+        self._keys[seq] = keys
+        self._order.add(seq)
+        self._index(seq, keys)
+
+    def _replace(self, seq, book, keys):
+        # Only indexes whose key changed are touched, so an update leaves the
+        # book where it was in every other bucket.
+        old_keys = self._keys[seq]
+        for index in self._indexes:
+            if index.key(old_keys) != index.key(keys):
+                index.remove(seq, old_keys)
+                index.add(seq, keys)
+        self._books[seq] = book
+        self._keys[seq] = keys
+
+    def _remove(self, seq):
+        self._unindex(seq, self._keys.pop(seq))
+        book = self._books.pop(seq)
+        self._order.discard(seq)
+        return book
+
+    def _log_put(self, seq, book):
+        if self._journal is not None:
+            self._journal.put(seq, book)
+            if self._journal.needs_snapshot():
+                self._snapshot_in_background()
+
+    def _log_delete(self, seq):
+        if self._journal is not None:
+            self._journal.delete(seq)
+            if self._journal.needs_snapshot():
+                self._snapshot_in_background()
+
+    def _snapshot_in_background(self):
+        # Copying the dict is only a pass over references; encoding the books
+        # happens on the journal's snapshot thread.
+        self._journal.snapshot_in_background(
+            list(self._books.items()), next_key=self._next_seq
+        )
+
+    def _facet(self, index, field):
+        return {
+            self._books[earliest].get(field): count
+            for count, earliest in index.counts().values()
+        }
+
+    def _lookup(self, index, key):
+        return [self._books[seq] for seq in index.get(key)]
+
+    @staticmethod
+    def _normalize(book):
+        fields = ("title", "author", "category")
+        if not isinstance(book, dict) or not all(
+            isinstance(book.get(field), str) for field in fields
+        ):
+            raise ValueError("A book needs a text title, author and category")
+        return tuple(book[field].casefold() for field in fields)
+
+    def _index(self, seq, keys):
+        for index in self._indexes:
+            index.add(seq, keys)
+
+    def _unindex(self, seq, keys):
+        for index in self._indexes:
+            index.remove(seq, keys)
@@ -0,0 +1,104 @@
+import sys
+from array import array
+
+from .store import BookStore
+
+
+class ColumnarBookStore(BookStore):
+    """Compact, struct-of-arrays variant of BookStore.
+
+    Instead of one Python object (with its own ``__dict__``) per book, ids,
+    ratings, years and write versions live in ``array`` columns and the string
+    fields in plain lists, one slot per row. Authors and descriptions repeat a
+    lot, so they are interned and shared between rows. ``Book`` objects are
+    only built when a book is read, so the public API is the same as BookStore.
+
+    Deleted rows are left as tombstones and the columns are compacted once
+    tombstones outnumber live rows.
+    """
+
+    compact_min_rows = 1024
+
+    def __init__(self, books=(), book_type=None):
+        self._ids = array("i")
+        self._ratings = array("i")
+        self._years = array("i")
+        self._versions = array("q")
+        self._titles = []
+        self._authors = []
+        self._descriptions = []
+        self._dead = 0
+        super().__init__(books, book_type)
+
+    def _get(self, book_id):
+        row = self._books.get(book_id)
+        return None if row is None else self._book_at(row)
+
+    def _put(self, book, version):
+        row = self._books.get(book.id)
+        if row is None:
+            row = len(self._ids)
+            self._ids.append(book.id)
+            self._ratings.append(book.rating)
+            self._years.append(book.published_year)
+            self._versions.append(version)
+            self._titles.append(book.title)
+            self._authors.append(sys.intern(book.author))
+            self._descriptions.append(sys.intern(book.description))
+            # Publish the row only once every column has it.
+            self._books[book.id] = row
+        else:
+            self._ratings[row] = book.rating
+            self._years[row] = book.published_year
+            self._versions[row] = version
+            self._titles[row] = book.title
+            self._authors[row] = sys.intern(book.author)
+            self._descriptions[row] = sys.intern(book.description)
+
+    def _pop(self, book_id):
+        row = self._books.pop(book_id, None)
+        if row is None:
+            return None
+        book = self._book_at(row)
+        # Drop the string references so a tombstone only costs its int slots.
+        self._titles[row] = self._authors[row] = self._descriptions[row] = None
+        self._dead += 1
+        # Open views may still read rows by their current position.
+        if (
+            self._dead > max(len(self._books), self.compact_min_rows)
+            and not self._history
+        ):
+            self.compact()
+        return book
+
+    def _book_version(self, book_id):
+        row = self._books.get(book_id)
+        return None if row is None else self._versions[row]
+
+    def _values(self):
+        for row, book_id in enumerate(self._ids):
+            if self._books.get(book_id) == row:
+                yield self._book_at(row)
+
+    def _book_at(self, row):
+        return self._book_type(
+            self._ids[row],
+            self._titles[row],
+            self._authors[row],
+            self._descriptions[row],
+            self._ratings[row],
+            self._years[row],
+        )
+
+    def compact(self):
+        """Rewrite the columns without tombstones, keeping row order."""
+        live_rows = list(self._books.values())
+        self._ids = array("i", (self._ids[row] for row in live_rows))
+        self._ratings = array("i", (self._ratings[row] for row in live_rows))
+        self._years = array("i", (self._years[row] for row in live_rows))
+        self._versions = array("q", (self._versions[row] for row in live_rows))
+        self._titles = [self._titles[row] for row in live_rows]
+        self._authors = [self._authors[row] for row in live_rows]
+        self._descriptions = [self._descriptions[row] for row in live_rows]
+        self._books = {book_id: row for row, book_id in enumerate(self._ids)}
+        self._dead = 0
@@ -0,0 +1,78 @@
+import atexit
+import os
+
+from .catalog import BookCatalog
+from .columnar import ColumnarBookStore
+from .journal import Journal
+from .shared import SharedBookStore, SharedColumnarBookStore
+from .store import BookStore
+
+# "dict" keeps one Book object per book; "columnar" packs the catalog into
+# array columns (see ColumnarBookStore), trading a little read cost for RAM.
+BOOKSTORE_MODE = os.environ.get("BOOKSTORE_MODE", "dict")
+
+# When set, catalogs are journaled to this directory and reloaded on start.
+BOOKSTORE_DATA_DIR = os.environ.get("BOOKSTORE_DATA_DIR")
+
+# "memory" keeps each process's catalog private (optionally journaled, see
+# above); "sqlite" shares one catalog between all uvicorn workers through
+# <BOOKSTORE_DATA_DIR>/<name>.sqlite3, with each worker's store as a read cache.
+BOOKSTORE_BACKEND = os.environ.get("BOOKSTORE_BACKEND", "memory")
+
+STORE_MODES = {
+    "dict": BookStore,
+    "columnar": ColumnarBookStore,
+}
+
+SHARED_STORE_MODES = {
+    "dict": SharedBookStore,
+    "columnar": SharedColumnarBookStore,
+}
+
+
+def create_store(books=(), mode=None, name=None, book_type=None):
+    mode = mode or BOOKSTORE_MODE
+    if mode not in STORE_MODES:
+        raise ValueError(
+            f"Unknown BOOKSTORE_MODE {mode!r}, expected one of {sorted(STORE_MODES)}"
+        )
+    if BOOKSTORE_BACKEND not in ("memory", "sqlite"):
+        raise ValueError(
+            f"Unknown BOOKSTORE_BACKEND {BOOKSTORE_BACKEND!r}, expected memory or sqlite"
+        )
+    if BOOKSTORE_BACKEND == "sqlite":
+        return _open_shared(SHARED_STORE_MODES[mode], books, name, book_type)
+    store_type = STORE_MODES[mode]
+    return _open(lambda seed: store_type(seed, book_type), books, name)
+
+
+def create_catalog(books=(), name=None):
+    return _open(BookCatalog, books, name)
+
+
+def _open(factory, books, name):
+    # Persistence is opt-in: without a data dir (or a name to file it under) the
+    # catalog is purely in memory and starts from the seed books.
+    if not (BOOKSTORE_DATA_DIR and name):
+        return factory(books)
+    journal = Journal(BOOKSTORE_DATA_DIR, name)
+    atexit.register(journal.close)
+    if journal.exists():
+        store = factory(())
+        store.restore(journal)
+    else:
+        # First start: the seed books become the initial snapshot.
+        store = factory(books)
+        store.restore(journal)
+        store.snapshot()
+    return store
+
+
+def _open_shared(store_type, books, name, book_type):
+    if not (BOOKSTORE_DATA_DIR and name):
+        raise ValueError("BOOKSTORE_BACKEND=sqlite needs BOOKSTORE_DATA_DIR")
+    os.makedirs(BOOKSTORE_DATA_DIR, exist_ok=True)
+    path = os.path.join(BOOKSTORE_DATA_DIR, f"{name}.sqlite3")
+    store = store_type(path, books, book_type)
+    atexit.register(store.close)
+    return store
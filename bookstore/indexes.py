@@ -0,0 +1,145 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+_ID_MASK = (1 << 32) - 1
+
+
+class HashIndex:
+    """Secondary index mapping a key (e.g. a rating) to the ids of the books that have it.
+
+    Buckets are dicts used as sets, so removing an id is O(1). Ids are handed out
+    in increasing order, so results are returned sorted to match catalog order
+    even after a book has moved between buckets.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._buckets = {}
+
+    def add(self, book_id, book):
+        self._buckets.setdefault(self.key(book), {})[book_id] = None
+
+    def remove(self, book_id, book):
+        key = self.key(book)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(book_id, None)
+        if not bucket:
+            del self._buckets[key]
+
+    def get(self, key):
+        return sorted(self._buckets.get(key, ()))
+
+    def first(self, key):
+        return min(self._buckets.get(key, ()), default=None)
+
+    def counts(self):
+        """``{key: (size, earliest id)}`` in O(number of keys).
+
+        Buckets are insertion-ordered, so their first id is the one that has
+        been in the bucket longest; nothing is scanned.
+        """
+        return {
+            key: (len(bucket), next(iter(bucket)))
+            for key, bucket in self._buckets.items()
+        }
+
+
+class RangeIndex:
+    """Sorted index on one integer field, for range queries in O(log n + k).
+
+    Entries are packed as ``value << 32 | book_id`` into a sorted ``array('q')``,
+    so one bisect finds either end of a range and ties stay ordered by id.
+    Inserts and deletes are a bisect plus a memmove of the tail.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._entries = array("q")
+
+    def add(self, book_id, book):
+        insort(self._entries, self._entry(book_id, book))
+
+    def add_many(self, items):
+        # Bulk build: append everything and sort once instead of n insorts.
+        self._entries.extend(self._entry(book_id, book) for book_id, book in items)
+        self._entries = array("q", sorted(self._entries))
+
+    def remove(self, book_id, book):
+        entry = self._entry(book_id, book)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def count(self, low=None, high=None):
+        start, stop = self._bounds(low, high)
+        return stop - start
+
+    def get(self, low=None, high=None):
+        """Ids with ``low <= value <= high`` (either end optional), ordered by value."""
+        start, stop = self._bounds(low, high)
+        return [entry & _ID_MASK for entry in self._entries[start:stop]]
+
+    def _bounds(self, low, high):
+        start = 0 if low is None else bisect_left(self._entries, low << 32)
+        stop = (
+            len(self._entries)
+            if high is None
+            else bisect_right(self._entries, high << 32 | _ID_MASK)
+        )
+        return start, max(start, stop)
+
+    def _entry(self, book_id, book):
+        return self.key(book) << 32 | book_id
+
+
+class TopIndex:
+    """Books ranked by one integer field, kept sorted per partition.
+
+    ``partition`` maps a book to the group it is ranked in (an author, a
+    year, ...). Each group is a sorted ``array('q')`` of
+    ``value << 32 | (MAX_ID - book_id)``, so the best ``k`` books of a group
+    are its last ``k`` entries: highest value first, lower id first on ties.
+    """
+
+    def __init__(self, key, partition):
+        self.key = key
+        self.partition = partition
+        self._groups = {}
+
+    def add(self, book_id, book):
+        group = self._groups.setdefault(self.partition(book), array("q"))
+        insort(group, self._entry(book_id, book))
+
+    def add_many(self, items):
+        # Bulk build: collect each group's entries and sort them once.
+        groups = {}
+        for book_id, book in items:
+            groups.setdefault(self.partition(book), []).append(
+                self._entry(book_id, book)
+            )
+        for partition, entries in groups.items():
+            group = self._groups.setdefault(partition, array("q"))
+            group.extend(entries)
+            self._groups[partition] = array("q", sorted(group))
+
+    def remove(self, book_id, book):
+        partition = self.partition(book)
+        group = self._groups.get(partition)
+        if group is None:
+            return
+        entry = self._entry(book_id, book)
+        i = bisect_left(group, entry)
+        if i < len(group) and group[i] == entry:
+            del group[i]
+        if not group:
+            del self._groups[partition]
+
+    def top(self, partition, k):
+        """Ids of the ``k`` best books in ``partition``, best first."""
+        group = self._groups.get(partition, ())
+        return [_ID_MASK - (entry & _ID_MASK) for entry in reversed(group[-k:])]
+
+    def _entry(self, book_id, book):
+        return self.key(book) << 32 | (_ID_MASK - book_id)
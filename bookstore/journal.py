@@ -0,0 +1,252 @@
+import json
+import mmap
+import os
+import threading
+import time
+
+PUT = "p"
+DELETE = "d"
+
+# Snapshots are decoded in blocks of roughly this many bytes.
+LOAD_BLOCK_SIZE = 4 * 1024 * 1024
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class Journal:
+    """Append-only mutation log plus periodic snapshots for one catalog.
+
+    Every write is appended to ``<name>.journal`` as one JSON line and flushed
+    to the OS right away; ``fsync`` is batched to every ``fsync_every`` records
+    or ``fsync_interval`` seconds, whichever comes first. Once
+    ``snapshot_every`` records have piled up, the owning store starts a full
+    ``<name>.snapshot`` in the background: the journal is moved aside to
+    ``<name>.journal.1`` and writes go on into a fresh one while a thread
+    writes the snapshot, after which the moved-aside journal is deleted. The
+    snapshot starts with a header recording the store's next key, so keys of
+    books deleted before the snapshot are not handed out again after a restart.
+
+    Replaying is idempotent (puts are upserts, deletes of missing keys are
+    no-ops), so a crash between writing a snapshot and deleting the journal it
+    covers only means some records are applied twice on the next start.
+    """
+
+    def __init__(
+        self,
+        directory,
+        name,
+        fsync_every=100,
+        fsync_interval=1.0,
+        snapshot_every=100_000,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot")
+        self.journal_path = os.path.join(directory, f"{name}.journal")
+        self.rotated_path = self.journal_path + ".1"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.records = 0
+        # Set by load() from the snapshot header; None for older snapshots.
+        self.next_key = None
+        self._snapshot_thread = None
+
+    def exists(self):
+        return any(
+            os.path.exists(path)
+            for path in (self.snapshot_path, self.rotated_path, self.journal_path)
+        )
+
+    def load(self):
+        """Yield (op, key, row) for the snapshot followed by the journal tail.
+
+        The tail is a journal moved aside for a snapshot that never finished,
+        if there is one, then the current journal.
+        """
+        if os.path.exists(self.snapshot_path):
+            for record in _read_snapshot(self.snapshot_path):
+                if isinstance(record, dict):
+                    self.next_key = record.get("next_key")
+                    continue
+                key, row = record
+                yield PUT, key, row
+        for path in (self.rotated_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            for line in _read_lines(path):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-append; everything before it is intact.
+                    break
+                self.records += 1
+                if record[0] == PUT:
+                    yield PUT, record[1], record[2]
+                else:
+                    yield DELETE, record[1], None
+
+    def put(self, key, row):
+        self._append([PUT, key, row])
+
+    def delete(self, key):
+        self._append([DELETE, key])
+
+    def needs_snapshot(self):
+        return self.records >= self.snapshot_every and not self.snapshot_running()
+
+    def snapshot_running(self):
+        return self._snapshot_thread is not None and self._snapshot_thread.is_alive()
+
+    def wait_for_snapshot(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+
+    def write_snapshot(self, items, next_key=None):
+        """Write ``(key, row)`` pairs as the new snapshot and start an empty journal.
+
+        ``next_key`` is the next key the store would hand out; load() makes it
+        available again as ``self.next_key``.
+        """
+        self.wait_for_snapshot()
+        self._write_snapshot_file(items, next_key)
+        self.close()
+        open(self.journal_path, "w").close()
+        _remove(self.rotated_path)
+        _fsync_directory(self.directory)
+        self.records = 0
+
+    def snapshot_in_background(self, items, next_key=None, done=None):
+        """Start a fresh journal now and write ``items`` as the snapshot on a thread.
+
+        ``items`` is consumed on that thread while writes carry on, so it must
+        read a fixed copy of the catalog, such as a View; ``done`` is called
+        once the snapshot is written or has failed. Returns the thread.
+        """
+        self.wait_for_snapshot()
+        if os.path.exists(self.rotated_path):
+            # Left by a snapshot that never finished; its records are in no
+            # snapshot yet, so it can't be replaced by the current journal.
+            try:
+                self.write_snapshot(items, next_key)
+            finally:
+                if done is not None:
+                    done()
+            return None
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.rotated_path)
+            _fsync_directory(self.directory)
+        self.records = 0
+        self._snapshot_thread = threading.Thread(
+            target=self._finish_snapshot,
+            args=(items, next_key, done),
+            name=f"snapshot {os.path.basename(self.snapshot_path)}",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+        return self._snapshot_thread
+
+    def _finish_snapshot(self, items, next_key, done):
+        try:
+            self._write_snapshot_file(items, next_key)
+        finally:
+            if done is not None:
+                done()
+        _remove(self.rotated_path)
+        _fsync_directory(self.directory)
+
+    def _write_snapshot_file(self, items, next_key):
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if next_key is not None:
+                f.write(_encode({"next_key": next_key}) + "\n")
+            f.writelines(_encode([key, row]) + "\n" for key, row in items)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _append(self, record):
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._file.write(_encode(record) + "\n")
+        self._file.flush()
+        self.records += 1
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+
+def _read_snapshot(path):
+    # Snapshots are written in one go and renamed into place, so every line is
+    # complete. Decode whole blocks of lines at once as a single JSON array
+    # instead of calling json.loads per line.
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = f.read()
+        start = 0
+        while start < len(data):
+            end = data.rfind(b"\n", start, start + LOAD_BLOCK_SIZE)
+            if end < start:
+                end = data.find(b"\n", start)
+                if end < 0:
+                    end = len(data)
+            block = data[start:end].replace(b"\n", b",")
+            yield from json.loads(b"[" + block + b"]")
+            start = end + 1
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def _read_lines(path):
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files can't be mapped (and some filesystems refuse mmap).
+            yield from f
+            return
+        with data:
+            yield from iter(data.readline, b"")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,141 @@
+import threading
+import time
+from bisect import bisect_right
+from operator import itemgetter
+
+
+class History:
+    """Superseded versions of records, kept only while a View might read them.
+
+    Writers call ``record`` with the version they are about to publish and the
+    record as it was *before* the write, then change the primary storage.
+    Readers fetch the primary record first and then look here, so whichever
+    side of a concurrent write they land on they get the value as of their
+    own version.
+
+    Versions are pinned either by open views (released with ``close``) or
+    for a TTL, so cursors handed to clients can come back to the same version.
+    Nothing is recorded while nothing is pinned.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._pins = {}
+        self._next_expiry = None
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self._pins)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def pin(self, version, ttl=None):
+        with self._lock:
+            pin = self._pins.setdefault(version, [0, 0.0])
+            if ttl is None:
+                pin[0] += 1
+            else:
+                pin[1] = max(pin[1], time.monotonic() + ttl)
+                if self._next_expiry is None or pin[1] < self._next_expiry:
+                    self._next_expiry = pin[1]
+
+    def unpin(self, version):
+        with self._lock:
+            pin = self._pins.get(version)
+            if pin is not None:
+                pin[0] -= 1
+                if pin[0] <= 0 and pin[1] <= time.monotonic():
+                    del self._pins[version]
+                    self._prune()
+
+    def extend(self, version, ttl):
+        # Re-pins a version only if it is still pinned, since its history may
+        # already be gone otherwise.
+        with self._lock:
+            self._expire()
+            pin = self._pins.get(version)
+            if pin is None:
+                return False
+            pin[1] = max(pin[1], time.monotonic() + ttl)
+            return True
+
+    def record(self, key, version, old_record):
+        if not self._pins:
+            return
+        with self._lock:
+            self._expire()
+            if self._pins:
+                self._entries.setdefault(key, []).append((version, old_record))
+
+    def read(self, key, version, get):
+        current = get(key)
+        entries = self._entries.get(key)
+        if entries:
+            # The first write after ``version`` holds the record as it was then.
+            i = bisect_right(entries, version, key=itemgetter(0))
+            if i < len(entries):
+                return entries[i][1]
+        return current
+
+    def _expire(self):
+        now = time.monotonic()
+        if self._next_expiry is None or now < self._next_expiry:
+            return
+        self._pins = {
+            version: pin
+            for version, pin in self._pins.items()
+            if pin[0] > 0 or pin[1] > now
+        }
+        expiries = [pin[1] for pin in self._pins.values() if pin[1] > now]
+        self._next_expiry = min(expiries, default=None)
+        self._prune()
+
+    def _prune(self):
+        # Entries at or below the oldest pinned version can never be read again.
+        if not self._pins:
+            self._entries = {}
+            return
+        oldest = min(self._pins)
+        entries = {}
+        for key, versions in self._entries.items():
+            kept = [entry for entry in versions if entry[0] > oldest]
+            if kept:
+                entries[key] = kept
+        self._entries = entries
+
+
+class View:
+    """Read-only view of a store as of one version.
+
+    Creating one is O(1): it only pins the version. Reads see the catalog
+    exactly as it was at that version, no matter what is written meanwhile.
+    Close it (or use it as a context manager) when done, unless it was
+    opened with a TTL, in which case it expires on its own.
+    """
+
+    def __init__(self, store, version, pinned=True):
+        self._store = store
+        self.version = version
+        self._pinned = pinned
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, key):
+        return self._store._history.read(key, self.version, self._store._get)
+
+    def page(self, after=None, limit=100):
+        return self._store._order.page(self.get, after, limit)
+
+    def all(self):
+        books, _ = self.page(limit=None)
+        return books
+
+    def close(self):
+        if self._pinned:
+            self._pinned = False
+            self._store._history.unpin(self.version)
@@ -0,0 +1,49 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class KeyOrder:
+    """Sorted array of primary keys, used to seek to a cursor in O(log n).
+
+    Deletes are lazy: the key stays in the array and is skipped on read until
+    dead keys outnumber live ones, at which point the array is rebuilt.
+    """
+
+    def __init__(self, is_live):
+        self._is_live = is_live
+        self._keys = array("q")
+        self._dead = 0
+
+    def add(self, key):
+        keys = self._keys
+        if not keys or key > keys[-1]:
+            keys.append(key)
+            return
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            keys.insert(i, key)
+
+    def discard(self, key):
+        self._dead += 1
+        if self._dead > len(self._keys) // 2:
+            self._keys = array("q", (k for k in self._keys if self._is_live(k)))
+            self._dead = 0
+
+    def page(self, get, after=None, limit=100):
+        """Return up to ``limit`` items with keys after ``after`` and the next cursor.
+
+        The cursor is the key of the last item returned, or None on the last page.
+        """
+        keys = self._keys
+        items = []
+        last_key = None
+        start = 0 if after is None else bisect_right(keys, after)
+        for i in range(start, len(keys)):
+            item = get(keys[i])
+            if item is None:
+                continue
+            if len(items) == limit:
+                return items, last_key
+            items.append(item)
+            last_key = keys[i]
+        return items, None
@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+DEFAULT_PAGE_SIZE = 100
+STREAM_CHUNK_SIZE = 1000
+# How long a paginated walk can pause between pages and still see the catalog
+# as of its first page.
+SNAPSHOT_TTL = 60
+
+
+def wants_ndjson(request):
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def paginate(request, response, store, limit=None, cursor=None, **link_params):
+    """Return one page of ``store`` and point the Link header at the next one."""
+    books, next_cursor = store.page(after=cursor, limit=limit or DEFAULT_PAGE_SIZE)
+    if next_cursor is not None:
+        next_url = request.url.include_query_params(
+            limit=limit or DEFAULT_PAGE_SIZE, cursor=next_cursor, **link_params
+        )
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return books
+
+
+def paginate_snapshot(request, response, store, limit=None, cursor=None, snapshot=None):
+    """Like paginate, but every page of one walk reads the same store version.
+
+    The first page pins the current version for SNAPSHOT_TTL seconds and the
+    next link carries it as ``snapshot``, so writes made while a client pages
+    through never shift, duplicate or tear the books it sees. If the snapshot
+    has expired the walk carries on from the current version.
+
+    The ETag names the version the page was read at, not the current one, so
+    a snapshot page is never confused with the live page at a later version.
+    """
+    view = None if snapshot is None else store.view_at(snapshot, SNAPSHOT_TTL)
+    # Check If-None-Match before pinning a fresh version for the walk.
+    etag = catalog_etag(store, store.version if view is None else view.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if view is None:
+        view = store.view(ttl=SNAPSHOT_TTL)
+        etag = catalog_etag(store, view.version)
+    response.headers["ETag"] = etag
+    return paginate(request, response, view, limit, cursor, snapshot=view.version)
+
+
+def iter_pages(store, after=None, chunk_size=STREAM_CHUNK_SIZE):
+    # Walks the store one page at a time, so only one chunk is ever in memory.
+    # Stores that support views are read from one, so the whole walk is a
+    # consistent snapshot even while writes continue.
+    view = store.view() if hasattr(store, "view") else None
+    try:
+        while True:
+            books, after = (view or store).page(after=after, limit=chunk_size)
+            if books:
+                yield [_fields(book) for book in books]
+            if after is None:
+                return
+    finally:
+        if view is not None:
+            view.close()
+
+
+_encode_line = json.JSONEncoder(default=jsonable_encoder).encode
+
+
+def _fields(book):
+    # Books are dicts or plain objects holding JSON-ready values, so streaming
+    # skips jsonable_encoder's per-field dispatch (by far the slowest step).
+    return book if isinstance(book, dict) else vars(book)
+
+
+def iter_ndjson(store, after=None, chunk_size=STREAM_CHUNK_SIZE):
+    for books in iter_pages(store, after, chunk_size):
+        yield "".join(_encode_line(book) + "\n" for book in books).encode()
+
+
+def iter_csv(store, chunk_size=STREAM_CHUNK_SIZE):
+    # Header comes from the first book's fields; an empty store is an empty file.
+    fieldnames = None
+    for books in iter_pages(store, chunk_size=chunk_size):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames or list(books[0]))
+        if fieldnames is None:
+            fieldnames = writer.fieldnames
+            writer.writeheader()
+        writer.writerows(books)
+        yield buffer.getvalue().encode()
+
+
+def ndjson_response(store, after=None):
+    return StreamingResponse(iter_ndjson(store, after), media_type=NDJSON_MEDIA_TYPE)
+
+
+def export_response(store, file_format, filename):
+    # Streams the whole store as a downloadable CSV or NDJSON file.
+    if file_format == "csv":
+        body, media_type = iter_csv(store), CSV_MEDIA_TYPE
+    else:
+        body, media_type = iter_ndjson(store), NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{file_format}"'
+        },
+    )
+
+
+class PreEncodedJSONResponse(Response):
+    # Body is already JSON bytes, so there is nothing left to encode.
+    media_type = "application/json"
+
+
+class ResponseCache:
+    """Encoded JSON bodies for catalog reads, valid for one store version.
+
+    The first request after a write encodes the result once (same output as
+    FastAPI's JSONResponse); every later request until the next write is served
+    the cached bytes without touching ``jsonable_encoder``.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entry = (None, None, {})
+
+    def response(self, store, key, build):
+        # (store, version, bodies) is swapped as one tuple so a concurrent write
+        # can't leave bodies from an older version filed under a newer one.
+        version = store.version
+        entry = self._entry
+        if entry[0] is not store or entry[1] != version:
+            entry = self._entry = (store, version, {})
+        bodies = entry[2]
+        body = bodies.get(key)
+        if body is None:
+            body = encode_json(build())
+            if len(bodies) < self.max_entries:
+                bodies[key] = body
+        return PreEncodedJSONResponse(body)
+
+
+def encode_json(content):
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def catalog_etag(store, version=None):
+    if version is None:
+        version = store.version
+    return f'"{store.epoch}-{version}"'
+
+
+def book_etag(store, book_id):
+    version = store.book_version(book_id)
+    return None if version is None else f'"{store.epoch}-{book_id}-{version}"'
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or etag is None:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == etag or candidate == "*":
+            return True
+    return False
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,128 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.casefold())
+
+
+class InvertedIndex:
+    """Full-text index over title, author and description, ranked with BM25.
+
+    Postings map each term to ``{book_id: term frequency}``, so adding or
+    removing a book only touches the terms it contains. A query only visits
+    the postings of its own terms, never the whole catalog.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+
+    def add(self, book_id, book):
+        terms = Counter(self._tokens(book))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[book_id] = count
+        length = sum(terms.values())
+        self._lengths[book_id] = length
+        self._total_length += length
+
+    def add_many(self, items):
+        for book_id, book in items:
+            self.add(book_id, book)
+
+    def remove(self, book_id, book):
+        for term in set(self._tokens(book)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(book_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(book_id, 0)
+
+    def search(self, query, limit=10):
+        """Return up to ``limit`` ``(book_id, score)`` pairs, best match first."""
+        if not self._lengths:
+            return []
+        doc_count = len(self._lengths)
+        average_length = self._total_length / doc_count
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for book_id, tf in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[book_id] / average_length
+                )
+                scores[book_id] = scores.get(book_id, 0.0) + idf * tf * (
+                    self.k1 + 1
+                ) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _tokens(book):
+        return tokenize(f"{book.title} {book.author} {book.description}")
+
+
+def trigrams(text):
+    # Each word padded like pg_trgm does, so word starts weigh more than middles.
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Typo-tolerant lookup on one string key, ranked by trigram similarity.
+
+    Postings map each trigram to the ids whose key contains it, so a query
+    only counts shared trigrams for keys that share at least one with it,
+    instead of computing an edit distance against every key. Similarity is
+    the Jaccard index of the two trigram sets.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._postings = {}
+        self._sizes = {}
+
+    def add(self, item_id, item):
+        grams = trigrams(self.key(item))
+        for gram in grams:
+            self._postings.setdefault(gram, {})[item_id] = None
+        self._sizes[item_id] = len(grams)
+
+    def remove(self, item_id, item):
+        for gram in trigrams(self.key(item)):
+            postings = self._postings.get(gram)
+            if postings is None:
+                continue
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[gram]
+        self._sizes.pop(item_id, None)
+
+    def search(self, text, limit=10, threshold=0.3):
+        """Return up to ``limit`` ``(item_id, similarity)`` pairs, most similar first."""
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, {}).keys())
+        matches = []
+        for item_id, count in shared.items():
+            similarity = count / (len(grams) + self._sizes[item_id] - count)
+            if similarity >= threshold:
+                matches.append((item_id, similarity))
+        return heapq.nsmallest(limit, matches, key=lambda item: (-item[1], item[0]))
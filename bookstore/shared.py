@@ -0,0 +1,268 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from .columnar import ColumnarBookStore
+from .store import BookStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY, book_id INTEGER NOT NULL, data TEXT
+);
+"""
+
+
+class SharedStoreMixin:
+    """Keeps a store in sync with a SQLite file shared by several processes.
+
+    Every uvicorn worker opens the same file (WAL mode, so readers never block
+    the writer) and keeps its own in-memory store as a read cache. Writes run
+    inside ``BEGIN IMMEDIATE``: the worker first replays the changes other
+    workers committed, then applies its own write locally and records it in
+    the ``changes`` table, so ``version`` is the same sequence number in every
+    worker and ETags stay valid whichever worker answers. Ids come from a
+    counter in the file, so two workers never hand out the same one.
+
+    Reads check ``PRAGMA data_version``, which only moves when another
+    connection commits, and replay the new changes before answering. A worker
+    that falls behind the retained change log reloads from the ``books`` table.
+    """
+
+    keep_changes = 10_000
+
+    def __init__(self, path, books=(), book_type=None):
+        if book_type is None:
+            raise ValueError("A shared store needs book_type to rebuild books")
+        self._db = None
+        super().__init__((), book_type)
+        self._db = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=30
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._data_version = None
+        with self._transaction():
+            epoch = self._meta("epoch")
+            if epoch is None:
+                # First process to open the file seeds it.
+                self._db.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [("epoch", self.epoch), ("next_id", 1)],
+                )
+                self.add_many(list(books))
+            else:
+                self.epoch = epoch
+                self._reload()
+
+    @property
+    def version(self):
+        # Outside a transaction this is a read from a request (e.g. for an
+        # ETag), so pick up other workers' writes first. Inside one, the
+        # store itself is reading or bumping it.
+        if self._db is not None and not self._db.in_transaction:
+            self._refresh()
+        return self._version
+
+    @version.setter
+    def version(self, value):
+        self._version = value
+
+    def close(self):
+        self._db.close()
+
+    # Reads
+
+    def __len__(self):
+        self._refresh()
+        return super().__len__()
+
+    def all(self):
+        self._refresh()
+        return super().all()
+
+    def get(self, book_id):
+        self._refresh()
+        return super().get(book_id)
+
+    def by_rating(self, rating):
+        self._refresh()
+        return super().by_rating(rating)
+
+    def by_year(self, published_year):
+        self._refresh()
+        return super().by_year(published_year)
+
+    def search(self, query, limit=10):
+        self._refresh()
+        return super().search(query, limit)
+
+    def in_range(self, *args, **kwargs):
+        self._refresh()
+        return super().in_range(*args, **kwargs)
+
+    def query(self, *args, **kwargs):
+        self._refresh()
+        return super().query(*args, **kwargs)
+
+    def top(self, k=10, author=None, year=None):
+        self._refresh()
+        return super().top(k, author, year)
+
+    def book_version(self, book_id):
+        self._refresh()
+        return super().book_version(book_id)
+
+    def page(self, after=None, limit=100):
+        self._refresh()
+        return super().page(after, limit)
+
+    # Writes
+
+    def next_id(self):
+        return self.allocate_ids(1)[0]
+
+    def allocate_ids(self, count):
+        with self._transaction():
+            first = self._meta("next_id")
+            self._db.execute(
+                "UPDATE meta SET value = ? WHERE key = 'next_id'", (first + count,)
+            )
+        return range(first, first + count)
+
+    def add(self, book):
+        with self._transaction():
+            return super().add(book)
+
+    def add_many(self, books):
+        with self._transaction():
+            return super().add_many(books)
+
+    def update(self, book):
+        with self._transaction():
+            return super().update(book)
+
+    def delete(self, book_id):
+        with self._transaction():
+            return super().delete(book_id)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the file's write lock up front, so catching up
+        # and writing happen against a state no other worker can change.
+        with self._lock:
+            if self._db.in_transaction:
+                yield
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            start = self._version
+            try:
+                self._catch_up()
+                start = self._version
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                if self._version != start:
+                    # The local store already applied writes that never landed.
+                    with self._read_transaction():
+                        self._reload()
+                raise
+            self._db.execute("COMMIT")
+
+    @contextmanager
+    def _read_transaction(self):
+        # One consistent snapshot of the file for the whole catch-up.
+        self._db.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self._db.execute("COMMIT")
+
+    def _refresh(self):
+        with self._lock:
+            data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            with self._read_transaction():
+                self._catch_up()
+
+    def _catch_up(self):
+        changes = self._db.execute(
+            "SELECT seq, book_id, data FROM changes WHERE seq > ? ORDER BY seq",
+            (self._version,),
+        ).fetchall()
+        if changes and changes[0][0] != self._version + 1:
+            self._reload()
+            return
+        for seq, book_id, data in changes:
+            self._apply(seq, book_id, data)
+
+    def _apply(self, seq, book_id, data):
+        # Local writes bump version by one, so starting from seq - 1 gives the
+        # book the same version it has in every other worker.
+        self._version = seq - 1
+        old_book = self._get(book_id)
+        if data is not None:
+            book = self._book_type(*json.loads(data))
+            if old_book is None:
+                self._insert(book)
+            else:
+                self._replace(old_book, book)
+        elif old_book is not None:
+            self._remove(book_id)
+        self._version = seq
+
+    def _reload(self):
+        rows = self._db.execute("SELECT id, data, version FROM books").fetchall()
+        for book_id, data, version in rows:
+            if self._book_version(book_id) != version:
+                self._apply(version, book_id, data)
+        live = {book_id for book_id, _, _ in rows}
+        for book_id in [book_id for book_id in self._books if book_id not in live]:
+            self._remove(book_id)
+        latest = self._db.execute("SELECT max(seq) FROM changes").fetchone()[0]
+        self._version = latest or 0
+
+    def _log_put(self, book):
+        self._record(book.id, json.dumps(self._to_row(book)))
+        self._db.execute(
+            "UPDATE meta SET value = max(value, ?) WHERE key = 'next_id'",
+            (book.id + 1,),
+        )
+
+    def _log_delete(self, book_id):
+        self._record(book_id, None)
+
+    def _record(self, book_id, data):
+        seq = self._version
+        self._db.execute("INSERT INTO changes VALUES (?, ?, ?)", (seq, book_id, data))
+        if data is None:
+            self._db.execute("DELETE FROM books WHERE id = ?", (book_id,))
+        else:
+            self._db.execute(
+                "INSERT INTO books VALUES (?, ?, ?) ON CONFLICT (id) DO UPDATE"
+                " SET data = excluded.data, version = excluded.version",
+                (book_id, data, seq),
+            )
+        self._db.execute(
+            "DELETE FROM changes WHERE seq <= ?", (seq - self.keep_changes,)
+        )
+
+    def _meta(self, key):
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+
+class SharedBookStore(SharedStoreMixin, BookStore):
+    pass
+
+
+class SharedColumnarBookStore(SharedStoreMixin, ColumnarBookStore):
+    pass
@@ -0,0 +1,380 @@
+import secrets
+import threading
+from operator import attrgetter
+
+from .indexes import HashIndex, RangeIndex, TopIndex
+from .journal import PUT
+from .mvcc import History, View
+from .pagination import KeyOrder
+from .search import InvertedIndex
+from .vectorized import ColumnMirror, filter_books, np
+
+# How top() groups books for each combination of filters it is given.
+_TOP_PARTITIONS = {
+    (): lambda book: (),
+    ("author",): lambda book: (book.author.casefold(),),
+    ("published_year",): lambda book: (book.published_year,),
+    ("author", "published_year"): lambda book: (
+        book.author.casefold(),
+        book.published_year,
+    ),
+}
+
+
+class BookStore:
+    """In-memory book catalog keyed by book id.
+
+    Keeps a primary dict on ``id`` plus hash indexes on ``rating`` and
+    ``published_year`` so lookups don't have to walk the whole catalog.
+    Insertion order is preserved, so listing the store returns books in the
+    same order the old ``books`` list did.
+
+    Writes and id allocation are serialized by a lock, so the store is safe to
+    share between thread-pool handlers. With a Journal attached (see
+    ``restore``) every write is also logged so the catalog survives restarts.
+
+    ``version`` goes up on every write, so callers can cache anything derived
+    from the catalog against it, and each book remembers the version it was
+    last written at. ``epoch`` is random per store instance, so versions from
+    before a restart never look current.
+    """
+
+    def __init__(self, books=(), book_type=None):
+        self._book_type = book_type
+        self._books = {}
+        self._book_versions = {}
+        self._rating_index = HashIndex(attrgetter("rating"))
+        self._year_index = HashIndex(attrgetter("published_year"))
+        self._indexes = [self._rating_index, self._year_index]
+        self._optional_indexes = {}
+        self._history = History()
+        self._order = KeyOrder(self._is_live)
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._journal = None
+        self.version = 0
+        self.epoch = secrets.token_hex(4)
+        for book in books:
+            self.add(book)
+
+    def __len__(self):
+        return len(self._books)
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __contains__(self, book_id):
+        return book_id in self._books
+
+    def all(self):
+        return list(self._values())
+
+    def get(self, book_id):
+        return self._get(book_id)
+
+    def by_rating(self, rating):
+        return [self._get(book_id) for book_id in self._rating_index.get(rating)]
+
+    def by_year(self, published_year):
+        return [self._get(book_id) for book_id in self._year_index.get(published_year)]
+
+    def search(self, query, limit=10):
+        # Full-text BM25 search over title, author and description, best match first.
+        index = self._optional_index("search", InvertedIndex)
+        return [self._get(book_id) for book_id, _ in index.search(query, limit)]
+
+    def in_range(self, year_from=None, year_to=None, min_rating=None, max_rating=None):
+        """Books with a published year and rating inside the given (inclusive) bounds.
+
+        Both range indexes can count their matches with two bisects, so only the
+        more selective one is scanned and the other bound is checked per book.
+        """
+        year_index = self._optional_index(
+            "year_range", lambda: RangeIndex(attrgetter("published_year"))
+        )
+        rating_index = self._optional_index(
+            "rating_range", lambda: RangeIndex(attrgetter("rating"))
+        )
+        if year_index.count(year_from, year_to) <= rating_index.count(
+            min_rating, max_rating
+        ):
+            book_ids = year_index.get(year_from, year_to)
+            low, high, field = min_rating, max_rating, "rating"
+        else:
+            book_ids = rating_index.get(min_rating, max_rating)
+            low, high, field = year_from, year_to, "published_year"
+        books = []
+        for book_id in sorted(book_ids):
+            book = self._get(book_id)
+            value = getattr(book, field)
+            if (low is None or value >= low) and (high is None or value <= high):
+                books.append(book)
+        return books
+
+    def query(
+        self,
+        min_rating=None,
+        max_rating=None,
+        year_from=None,
+        year_to=None,
+        authors=None,
+    ):
+        """Books matching every given predicate (bounds inclusive), in id order.
+
+        With NumPy installed the predicates run as boolean masks over a column
+        mirror of the catalog; without it this is a plain loop over every book.
+        """
+        predicates = (min_rating, max_rating, year_from, year_to, authors)
+        if np is None:
+            return filter_books(self._values(), *predicates)
+        index = self._optional_index("columns", ColumnMirror)
+        with self._lock:
+            # Writers may grow or compact the columns, so mask them under the lock.
+            book_ids = index.filter(*predicates)
+        return [self._get(book_id) for book_id in book_ids]
+
+    def view(self, ttl=None):
+        """Pin the current version and return a read-only View of it, in O(1).
+
+        Without ``ttl`` the view must be closed; with one it stays readable
+        through ``view_at`` for ``ttl`` seconds after the last lookup.
+        """
+        with self._lock:
+            version = self.version
+            self._history.pin(version, ttl)
+        return View(self, version, pinned=ttl is None)
+
+    def view_at(self, version, ttl):
+        # None when that version was never pinned or has expired.
+        if self._history.extend(version, ttl):
+            return View(self, version, pinned=False)
+        return None
+
+    def top(self, k=10, author=None, year=None):
+        """The ``k`` highest-rated books, optionally only by ``author`` and/or from ``year``.
+
+        Each filter combination gets its own ranking, built the first time it is
+        asked for and kept sorted on writes, so this is O(k) plus one dict lookup.
+        """
+        fields, partition = [], []
+        if author is not None:
+            fields.append("author")
+            partition.append(author.casefold())
+        if year is not None:
+            fields.append("published_year")
+            partition.append(year)
+        fields = tuple(fields)
+        index = self._optional_index(
+            ("top", fields),
+            lambda: TopIndex(attrgetter("rating"), _TOP_PARTITIONS[fields]),
+        )
+        return [self._get(book_id) for book_id in index.top(tuple(partition), k)]
+
+    def book_version(self, book_id):
+        return self._book_version(book_id)
+
+    def page(self, after=None, limit=100):
+        # Keyset pagination in id order: returns (books, next_cursor).
+        return self._order.page(self._get, after, limit)
+
+    def next_id(self):
+        # Ids only ever go up, so deleting the newest book never hands its id out again.
+        with self._lock:
+            book_id = self._next_id
+            self._next_id += 1
+            return book_id
+
+    def allocate_ids(self, count):
+        # Reserves a contiguous block of ids for a bulk insert.
+        with self._lock:
+            first = self._next_id
+            self._next_id += count
+            return range(first, first + count)
+
+    def add(self, book):
+        with self._lock:
+            if book.id in self:
+                raise ValueError(f"Book with ID {book.id} already exists")
+            if self._book_type is None:
+                self._book_type = type(book)
+            self._insert(book)
+            self._log_put(book)
+            return book
+
+    def add_many(self, books):
+        # All-or-nothing: either every book goes in (under one lock hold) or none does.
+        with self._lock:
+            for book in books:
+                if book.id in self:
+                    raise ValueError(f"Book with ID {book.id} already exists")
+            for book in books:
+                if self._book_type is None:
+                    self._book_type = type(book)
+                self._insert(book)
+                self._log_put(book)
+            return books
+
+    def update(self, book):
+        # Returns None when there is no book with that id, mirroring the old loop falling through.
+        with self._lock:
+            old_book = self._get(book.id)
+            if old_book is None:
+                return None
+            self._replace(old_book, book)
+            self._log_put(book)
+            return book
+
+    def delete(self, book_id):
+        with self._lock:
+            book = self._remove(book_id)
+            if book is not None:
+                self._log_delete(book_id)
+            return book
+
+    def restore(self, journal):
+        """Replay ``journal``'s snapshot and tail into the store, then log new writes to it."""
+        with self._lock:
+            book_type = self._book_type
+            for op, book_id, row in journal.load():
+                old_book = self._get(book_id)
+                if op == PUT:
+                    if old_book is None:
+                        self._insert(book_type(*row))
+                    else:
+                        self._replace(old_book, book_type(*row))
+                elif old_book is not None:
+                    self._remove(book_id)
+            if journal.next_key is not None:
+                self._next_id = max(self._next_id, journal.next_key)
+            self._journal = journal
+
+    def snapshot(self):
+        with self._lock:
+            self._journal.write_snapshot(
+                ((book.id, self._to_row(book)) for book in self._values()),
+                next_key=self._next_id,
+            )
+
+    def _optional_index(self, name, factory):
+        # Heavier indexes are only built the first time a feature needs them, so
+        # stores that never serve that query don't pay for them. Once built they
+        # are maintained on every write like the hash indexes.
+        index = self._optional_indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._optional_indexes.get(name)
+                if index is None:
+                    index = factory()
+                    index.add_many((book.id, book) for book in self._values())
+                    self._indexes.append(index)
+                    self._optional_indexes[name] = index
+        return index
+
+    # Each write publishes its version only once it is fully applied: readers
+    # such as ResponseCache read ``version`` without the lock, and must never
+    # see a version whose write is still missing from the books or indexes.
+
+    def _insert(self, book):
+        version = self.version + 1
+        self._history.record(book.id, version, None)
+        self._next_id = max(self._next_id, book.id + 1)
+        self._put(book, version)
+        self._order.add(book.id)
+        self._index(book)
+        self.version = version
+
+    def _replace(self, old_book, book):
+        version = self.version + 1
+        self._history.record(book.id, version, old_book)
+        self._unindex(old_book)
+        self._put(book, version)
+        self._index(book)
+        self.version = version
+
+    def _remove(self, book_id):
+        version = self.version + 1
+        if self._history:
+            # Views may still read this book, so log it before it goes.
+            book = self._get(book_id)
+            if book is None:
+                return None
+            self._history.record(book_id, version, book)
+            self._pop(book_id)
+        else:
+            book = self._pop(book_id)
+            if book is None:
+                return None
+        self._order.discard(book_id)
+        self._unindex(book)
+        self.version = version
+        return book
+
+    def _is_live(self, book_id):
+        # Deleted keys stay in the order while a view can still see them.
+        return book_id in self._books or book_id in self._history
+
+    def _log_put(self, book):
+        if self._journal is not None:
+            self._journal.put(book.id, self._to_row(book))
+            if self._journal.needs_snapshot():
+                self._snapshot_in_background()
+
+    def _log_delete(self, book_id):
+        if self._journal is not None:
+            self._journal.delete(book_id)
+            if self._journal.needs_snapshot():
+                self._snapshot_in_background()
+
+    def _snapshot_in_background(self):
+        # Pinning a view is O(1), so the write that triggered the snapshot
+        # doesn't wait for the catalog to be serialized.
+        view = self.view()
+        self._journal.snapshot_in_background(
+            ((book.id, self._to_row(book)) for book in _iter_view(view)),
+            next_key=self._next_id,
+            done=view.close,
+        )
+
+    @staticmethod
+    def _to_row(book):
+        # Positional order of Book.__init__, so a row rebuilds with book_type(*row).
+        return [
+            book.id,
+            book.title,
+            book.author,
+            book.description,
+            book.rating,
+            book.published_year,
+        ]
+
+    # Primary storage. ColumnarBookStore swaps these out for packed columns.
+
+    def _get(self, book_id):
+        return self._books.get(book_id)
+
+    def _put(self, book, version):
+        self._books[book.id] = book
+        self._book_versions[book.id] = version
+
+    def _pop(self, book_id):
+        self._book_versions.pop(book_id, None)
+        return self._books.pop(book_id, None)
+
+    def _book_version(self, book_id):
+        return self._book_versions.get(book_id)
+
+    def _values(self):
+        return self._books.values()
+
+    def _index(self, book):
+        for index in self._indexes:
+            index.add(book.id, book)
+
+    def _unindex(self, book):
+        for index in self._indexes:
+            index.remove(book.id, book)
+
+
+def _iter_view(view):
+    # Defers the read until the snapshot thread starts consuming the rows.
+    yield from view.all()
@@ -0,0 +1,132 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; BookStore.query falls back to filter_books.
+    np = None
+
+
+def filter_books(
+    books, min_rating=None, max_rating=None, year_from=None, year_to=None, authors=None
+):
+    """Plain-Python version of ColumnMirror.filter, one book at a time."""
+    authors = None if authors is None else {author.casefold() for author in authors}
+    return [
+        book
+        for book in books
+        if (min_rating is None or book.rating >= min_rating)
+        and (max_rating is None or book.rating <= max_rating)
+        and (year_from is None or book.published_year >= year_from)
+        and (year_to is None or book.published_year <= year_to)
+        and (authors is None or book.author.casefold() in authors)
+    ]
+
+
+class ColumnMirror:
+    """NumPy copy of the filterable fields, one row per book.
+
+    Every predicate of a query becomes one vectorized comparison over a whole
+    column and the results are and-ed into a boolean mask, so a compound filter
+    over a million books never runs a Python-level loop. Authors are stored as
+    small integer codes so an author set is a single ``np.isin``.
+
+    Columns grow by doubling. Updates append a fresh row and retire the old one;
+    retired rows are compacted away once they outnumber live ones.
+    """
+
+    compact_min_rows = 1024
+
+    def __init__(self, capacity=1024):
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._ratings = np.empty(capacity, dtype=np.int32)
+        self._years = np.empty(capacity, dtype=np.int32)
+        self._authors = np.empty(capacity, dtype=np.int32)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._rows = {}
+        self._author_codes = {}
+
+    def add(self, book_id, book):
+        if self._size == len(self._ids):
+            self._resize(2 * len(self._ids))
+        row = self._size
+        self._ids[row] = book_id
+        self._ratings[row] = book.rating
+        self._years[row] = book.published_year
+        self._authors[row] = self._author_code(book.author)
+        self._live[row] = True
+        self._rows[book_id] = row
+        self._size += 1
+
+    def add_many(self, items):
+        # Bulk build: fill each column from one list instead of n scalar stores.
+        items = list(items)
+        start, stop = self._size, self._size + len(items)
+        if stop > len(self._ids):
+            self._resize(max(stop, 2 * len(self._ids)))
+        self._ids[start:stop] = [book_id for book_id, _ in items]
+        self._ratings[start:stop] = [book.rating for _, book in items]
+        self._years[start:stop] = [book.published_year for _, book in items]
+        self._authors[start:stop] = [self._author_code(b.author) for _, b in items]
+        self._live[start:stop] = True
+        for row, (book_id, _) in enumerate(items, start):
+            self._rows[book_id] = row
+        self._size = stop
+
+    def remove(self, book_id, book):
+        row = self._rows.pop(book_id, None)
+        if row is None:
+            return
+        self._live[row] = False
+        if self._size - len(self._rows) > max(len(self._rows), self.compact_min_rows):
+            self._compact()
+
+    def filter(
+        self,
+        min_rating=None,
+        max_rating=None,
+        year_from=None,
+        year_to=None,
+        authors=None,
+    ):
+        """Ids of the books matching every given predicate, in id order."""
+        size = self._size
+        mask = self._live[:size].copy()
+        if min_rating is not None:
+            mask &= self._ratings[:size] >= min_rating
+        if max_rating is not None:
+            mask &= self._ratings[:size] <= max_rating
+        if year_from is not None:
+            mask &= self._years[:size] >= year_from
+        if year_to is not None:
+            mask &= self._years[:size] <= year_to
+        if authors is not None:
+            codes = [
+                self._author_codes[author.casefold()]
+                for author in authors
+                if author.casefold() in self._author_codes
+            ]
+            mask &= np.isin(self._authors[:size], codes)
+        book_ids = self._ids[:size][mask]
+        book_ids.sort()
+        return book_ids.tolist()
+
+    def _author_code(self, author):
+        return self._author_codes.setdefault(author.casefold(), len(self._author_codes))
+
+    def _resize(self, capacity):
+        for name in ("_ids", "_ratings", "_years", "_authors", "_live"):
+            column = getattr(self, name)
+            resized = np.zeros(capacity, dtype=column.dtype)
+            resized[: self._size] = column[: self._size]
+            setattr(self, name, resized)
+
+    def _compact(self):
+        live = np.flatnonzero(self._live[: self._size])
+        for name in ("_ids", "_ratings", "_years", "_authors"):
+            column = getattr(self, name)
+            column[: len(live)] = column[live]
+        self._live[: len(live)] = True
+        self._live[len(live) : self._size] = False
+        self._size = len(live)
+        self._rows = {
+            book_id: row for row, book_id in enumerate(self._ids[: self._size].tolist())
+        }
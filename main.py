@@ -1,8 +1,20 @@
 from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Request, Response
 from pydantic import BaseModel, Field
 
+from bookstore import create_store
+from bookstore.responses import (
+    ResponseCache,
+    book_etag,
+    catalog_etag,
+    etag_matches,
+    ndjson_response,
+    not_modified,
+    paginate_snapshot,
+    wants_ndjson,
+)
+
 app = FastAPI()
 
 
@@ -48,14 +60,22 @@ class BookRequest(BaseModel):
     }
 
 
-books = [
-    Book(1, "Computer Science Pro", "codingwithroby", "A very nice book!", 5, 2030),
-    Book(2, "Be Fast with FastAPI", "codingwithroby", "A great book!", 5, 2030),
-    Book(3, "Master Endpoints", "codingwithroby", "A awesome book!", 5, 2029),
-    Book(4, "HP1", "Author 1", "Book Description", 2, 2028),
-    Book(5, "HP2", "Author 2", "Book Description", 3, 2027),
-    Book(6, "HP3", "Author 3", "Book Description", 1, 2026),
-]
+books = create_store(
+    [
+        Book(1, "Computer Science Pro", "codingwithroby", "A very nice book!", 5, 2030),
+        Book(2, "Be Fast with FastAPI", "codingwithroby", "A great book!", 5, 2030),
+        Book(3, "Master Endpoints", "codingwithroby", "A awesome book!", 5, 2029),
+        Book(4, "HP1", "Author 1", "Book Description", 2, 2028),
+        Book(5, "HP2", "Author 2", "Book Description", 3, 2027),
+        Book(6, "HP3", "Author 3", "Book Description", 1, 2026),
+    ],
+    name="main",
+    book_type=Book,
+)
+
+
+# Encoded JSON for the catalog reads below, reused until the next write bumps books.version
+response_cache = ResponseCache()
 
 
 # GET Request
@@ -66,27 +86,47 @@ async def home_page():
 
 
 # Static Path Parameter
+# Pagination: pass limit (and the cursor from the Link header) to page through the catalog.
+# The Link header also pins the catalog version (snapshot), so later pages ignore newer writes.
+# Streaming: send "Accept: application/x-ndjson" to get one book per line in chunks.
 @app.get("/books")
-async def get_books():
-    return books
+async def get_books(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(default=None, gt=0, le=1000),
+    cursor: Optional[int] = Query(default=None, gt=0),
+    snapshot: Optional[int] = Query(default=None, ge=0),
+):
+    if wants_ndjson(request):
+        return ndjson_response(books, after=cursor)
+    if limit is None and cursor is None:
+        # Clients that already hold the current catalog version get a bodiless 304
+        etag = catalog_etag(books)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        cached_response = response_cache.response(books, "all", books.all)
+        cached_response.headers["ETag"] = etag
+        return cached_response
+    # Pages carry the ETag of the snapshot they were read from.
+    return paginate_snapshot(request, response, books, limit, cursor, snapshot)
 
 # IMP: Always keep the static path parameter above the dynamic path parameter
 # Query Parameter
 @app.get("/books/pubyear")
 async def read_by_year(pubyear: int):
-    books_to_return = []
-    for book in books:
-        print(type(pubyear))
-        if book.published_year == pubyear:
-            books_to_return.append(book)
-    return books_to_return
+    return response_cache.response(
+        books, ("pubyear", pubyear), lambda: books.by_year(pubyear)
+    )
 
 # Dynamic Path Parameter
 @app.get("/books/{book_id}")
-async def read_by_bookid(book_id: int):
-    for book in books:
-        if book.id == book_id:
-            return book
+async def read_by_bookid(request: Request, response: Response, book_id: int):
+    etag = book_etag(books, book_id)
+    if etag is not None:
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return books.get(book_id)
     return {"message": f"Book with ID {book_id} not found"}
 
 
@@ -94,11 +134,9 @@ async def read_by_bookid(book_id: int):
 # Query Parameter
 @app.get("/books/")
 async def read_by_rating(rating: int):
-    books_to_return = []
-    for book in books:
-        if book.rating == rating:
-            books_to_return.append(book)
-    return books_to_return
+    return response_cache.response(
+        books, ("rating", rating), lambda: books.by_rating(rating)
+    )
 
 
 
@@ -109,29 +147,24 @@ async def read_by_rating(rating: int):
 async def create_book(book_request: BookRequest):
     book_request.id = generate_book_id()
     new_book = Book(**book_request.model_dump())
-    books.append(new_book)
+    books.add(new_book)
     return {"message": "Book created successfully", "book": new_book}
 
 
 def generate_book_id():
-    book_id = 1 if len(books) == 0 else books[-1].id + 1
-    return book_id
+    return books.next_id()
 
 
 # PUT Request
 @app.put("/books/update_book")
 async def update_book(book_request: BookRequest):
     upd_book = Book(**book_request.model_dump())
-    for i in range(len(books)):
-        if books[i].id == upd_book.id:
-            books[i] = upd_book
-            return {"message": "Book updated successfully", "book": books[i]}
+    if books.update(upd_book) is not None:
+        return {"message": "Book updated successfully", "book": upd_book}
 
 
 # DELETE Request
 @app.delete("/books/delete_book")
 async def delete_book(book_id: int):
-    for i in range(len(books)):
-        if books[i].id == book_id:
-            books.pop(i)
-            return {"message": f"Book with ID {book_id} deleted successfully"}
+    if books.delete(book_id) is not None:
+        return {"message": f"Book with ID {book_id} deleted successfully"}
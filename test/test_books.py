@@ -0,0 +1,120 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+import books
+from bookstore import BookCatalog
+
+client = TestClient(books.app)
+
+
+@pytest.fixture
+def test_catalog(monkeypatch):
+    catalog = BookCatalog(
+        [
+            {"title": "Title One", "author": "Author One", "category": "science"},
+            {"title": "Title Two", "author": "Author Two", "category": "science"},
+            {"title": "Title Three", "author": "Author Three", "category": "history"},
+            {"title": "Title Six", "author": "Author Two", "category": "math"},
+        ]
+    )
+    monkeypatch.setattr(books, "books", catalog)
+    yield catalog
+
+
+def test_get_book_details(test_catalog):
+    response = client.get("/books", params={"book_title": "TITLE two"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["author"] == "Author Two"
+    response = client.get("/books", params={"book_title": "missing"})
+    assert response.json() == {"message": "missing book details not found"}
+
+
+def test_lookups_are_case_insensitive(test_catalog):
+    assert len(client.get("/books/SCIENCE").json()) == 2
+    assert len(client.get("/books/byauthor/", params={"author": "author two"}).json()) == 2
+    response = client.get(
+        "/books/authorcat", params={"author": "AUTHOR TWO", "category": "Math"}
+    )
+    assert [book["title"] for book in response.json()] == ["Title Six"]
+
+
+def test_update_moves_book_between_indexes(test_catalog):
+    response = client.put(
+        "/books/update_book",
+        json={"title": "title one", "author": "Author Nine", "category": "math"},
+    )
+    assert response.json() == {"message": "Book updated successfully"}
+    assert [b["title"] for b in test_catalog.by_category("science")] == ["Title Two"]
+    assert [b["title"] for b in test_catalog.by_author_category("author nine", "math")] == [
+        "title one"
+    ]
+    assert test_catalog.all()[0]["author"] == "Author Nine"
+
+
+def test_create_and_delete(test_catalog):
+    new_book = {"title": "Title Seven", "author": "Sandeep", "category": "Python"}
+    client.post("/books/create_book", json=new_book)
+    assert test_catalog.by_category("python") == [new_book]
+    response = client.request("DELETE", "/books/delete_book", json={"title": "title seven"})
+    assert response.json() == {"message": "Book deleted successfully"}
+    assert test_catalog.by_category("python") == []
+    assert test_catalog.by_author("sandeep") == []
+
+
+
+def test_malformed_books_are_rejected(test_catalog):
+    for body in ({"title": "Title Seven"}, ["Title Seven"], {"title": 7, "author": "A", "category": "B"}):
+        assert client.post("/books/create_book", json=body).status_code == 422
+        assert client.put("/books/update_book", json=body).status_code == 422
+    assert client.request("DELETE", "/books/delete_book", json=["Title One"]).status_code == 422
+    assert len(test_catalog) == 4
+    assert test_catalog.find_title("title seven") is None
+    assert test_catalog.page(after=None, limit=10)[0] == test_catalog.all()
+
+def test_get_all_books_paginated(test_catalog):
+    response = client.get("/bookstore", params={"limit": 3})
+    assert [book["title"] for book in response.json()] == ["Title One", "Title Two", "Title Three"]
+    assert 'cursor=3>; rel="next"' in response.headers["link"]
+    response = client.get("/bookstore", params={"limit": 3, "cursor": 3})
+    assert [book["title"] for book in response.json()] == ["Title Six"]
+
+
+
+def test_page_parameters_are_validated(test_catalog):
+    for params in ({"limit": -1}, {"limit": 0}, {"limit": 1001}, {"cursor": -1}):
+        assert client.get("/bookstore", params=params).status_code == 422
+    assert client.get("/books/fuzzy", params={"title": "title", "limit": -1}).status_code == 422
+
+def test_fuzzy_title_tolerates_typos(test_catalog):
+    response = client.get("/books/fuzzy", params={"title": "titel two"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["title"] == "Title Two"
+    response = client.get("/books/fuzzy", params={"title": "Tittle Six"})
+    assert response.json()[0]["title"] == "Title Six"
+    assert client.get("/books/fuzzy", params={"title": "zzzz"}).json() == []
+
+    client.request("DELETE", "/books/delete_book", json={"title": "Title Six"})
+    response = client.get("/books/fuzzy", params={"title": "Tittle Six"})
+    assert "Title Six" not in [book["title"] for book in response.json()]
+
+
+def test_facets_follow_writes(test_catalog):
+    response = client.get("/books/facets")
+    assert response.json() == {
+        "category": {"science": 2, "history": 1, "math": 1},
+        "author": {"Author One": 1, "Author Two": 2, "Author Three": 1},
+    }
+    client.post(
+        "/books/create_book",
+        json={"title": "Title Seven", "author": "author one", "category": "Math"},
+    )
+    client.put(
+        "/books/update_book",
+        json={"title": "Title Two", "author": "Author Two", "category": "history"},
+    )
+    client.request("DELETE", "/books/delete_book", json={"title": "Title Three"})
+    assert client.get("/books/facets").json() == {
+        "category": {"science": 1, "history": 1, "math": 2},
+        "author": {"Author One": 2, "Author Two": 2},
+    }
@@ -0,0 +1,384 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import status
+
+from .utils import *
+
+
+def test_get_books(test_store):
+    response = client.get("/books")
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["id"] for book in response.json()] == [1, 2, 3, 4, 5, 6]
+
+
+def test_read_by_bookid(test_store):
+    response = client.get("/books/4")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "HP1"
+
+
+def test_read_by_bookid_not_found(test_store):
+    response = client.get("/books/999")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Book not found"}
+
+
+def test_read_by_rating_and_year(test_store):
+    assert [b["id"] for b in client.get("/books/?rating=5").json()] == [1, 2, 3]
+    assert [b["id"] for b in client.get("/books/pubyear?pubyear=2027").json()] == [5]
+
+
+def test_create_update_delete(test_store):
+    request_data = {
+        "title": "A new book",
+        "author": "codingwithsandeep",
+        "description": "A new description of a book",
+        "rating": 4,
+        "published_year": 2025,
+    }
+    response = client.post("/books/", json=request_data)
+    assert response.status_code == 201
+    assert response.json()["book"]["id"] == 7
+    assert test_store.get(7).title == "A new book"
+
+    response = client.put("/books/", json={**request_data, "id": 7, "rating": 1})
+    assert response.status_code == 204
+    assert [b.id for b in test_store.by_rating(1)] == [6, 7]
+
+    response = client.delete("/books/7")
+    assert response.status_code == 204
+    assert 7 not in test_store
+
+
+def test_update_and_delete_not_found(test_store):
+    request_data = {
+        "id": 999,
+        "title": "A new book",
+        "author": "codingwithsandeep",
+        "description": "A new description of a book",
+        "rating": 4,
+        "published_year": 2025,
+    }
+    assert client.put("/books/", json=request_data).status_code == 404
+    assert client.delete("/books/999").status_code == 404
+
+
+def test_get_books_order_is_stable_after_mixed_writes(test_store):
+    request_data = {
+        "title": "A new book",
+        "author": "codingwithsandeep",
+        "description": "A new description of a book",
+        "rating": 4,
+        "published_year": 2025,
+    }
+    client.post("/books/", json=request_data)
+    client.delete("/books/2")
+    client.put("/books/", json={**request_data, "id": 4})
+    client.delete("/books/5")
+    client.post("/books/", json=request_data)
+    response = client.get("/books")
+    assert [book["id"] for book in response.json()] == [1, 3, 4, 6, 7, 8]
+    assert response.json()[2]["title"] == "A new book"
+
+
+def test_get_books_paginated(test_store):
+    response = client.get("/books", params={"limit": 4})
+    assert [book["id"] for book in response.json()] == [1, 2, 3, 4]
+    assert (
+        response.headers["link"]
+        == '<http://testserver/books?limit=4&cursor=4&snapshot=6>; rel="next"'
+    )
+
+    response = client.get("/books", params={"limit": 4, "cursor": 4})
+    assert [book["id"] for book in response.json()] == [5, 6]
+    assert "link" not in response.headers
+
+
+def test_snapshot_page_etag_names_the_snapshot_version(test_store):
+    first = client.get("/books", params={"limit": 3})
+    client.delete("/books/5")
+
+    response = client.get("/books", params={"limit": 3, "cursor": 3, "snapshot": 6})
+    assert [book["id"] for book in response.json()] == [4, 5, 6]
+    snapshot_etag = response.headers["etag"]
+    assert snapshot_etag == first.headers["etag"]
+    assert snapshot_etag.endswith('-6"')
+
+    # Once the snapshot is gone the old ETag must not match the live page.
+    response = client.get(
+        "/books",
+        params={"limit": 3, "cursor": 3},
+        headers={"If-None-Match": snapshot_etag},
+    )
+    assert response.status_code == 200
+    assert [book["id"] for book in response.json()] == [4, 6]
+    assert response.headers["etag"].endswith('-7"')
+
+
+def test_get_books_ndjson_stream(test_store):
+    response = client.get("/books", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5, 6]
+
+
+def test_create_after_deleting_newest_book_gets_a_fresh_id(test_store):
+    client.delete("/books/6")
+    response = client.post(
+        "/books/",
+        json={
+            "title": "A new book",
+            "author": "codingwithsandeep",
+            "description": "A new description of a book",
+            "rating": 4,
+            "published_year": 2025,
+        },
+    )
+    assert response.json()["book"]["id"] == 7
+
+
+def test_concurrent_creates_get_unique_ids(test_store):
+    request_data = {
+        "title": "A new book",
+        "author": "codingwithsandeep",
+        "description": "A new description of a book",
+        "rating": 4,
+        "published_year": 2025,
+    }
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        responses = list(
+            pool.map(lambda _: client.post("/books/", json=request_data), range(2000))
+        )
+    assert all(response.status_code == 201 for response in responses)
+    ids = [response.json()["book"]["id"] for response in responses]
+    assert sorted(ids) == list(range(7, 2007))
+    assert len(test_store) == 2006
+    assert len(test_store.by_rating(4)) == 2000
+
+
+def test_create_books_bulk_reports_errors_per_item(test_store):
+    good_book = {
+        "title": "A new book",
+        "author": "codingwithsandeep",
+        "description": "A new description of a book",
+        "rating": 4,
+        "published_year": 2025,
+    }
+    response = client.post(
+        "/books/bulk",
+        json=[good_book, {**good_book, "rating": 9}, good_book, "not a book"],
+    )
+    assert response.status_code == 201
+    assert [book["id"] for book in response.json()["books"]] == [7, 8]
+    errors = response.json()["errors"]
+    assert [error["index"] for error in errors] == [1, 3]
+    assert errors[0]["errors"][0]["loc"] == ["rating"]
+    assert len(test_store) == 8
+    assert [b.id for b in test_store.by_rating(4)] == [7, 8]
+
+
+def test_cached_reads_are_invalidated_by_writes(test_store):
+    first = client.get("/books/?rating=1")
+    assert [book["id"] for book in first.json()] == [6]
+    assert client.get("/books/?rating=1").content == first.content
+
+    client.put(
+        "/books/",
+        json={
+            "id": 5,
+            "title": "HP2",
+            "author": "Author 2",
+            "description": "Book Description",
+            "rating": 1,
+            "published_year": 2027,
+        },
+    )
+    assert [book["id"] for book in client.get("/books/?rating=1").json()] == [5, 6]
+    assert client.get("/books").json()[4]["rating"] == 1
+
+
+def test_get_books_etag(test_store):
+    response = client.get("/books")
+    etag = response.headers["etag"]
+    response = client.get("/books", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.delete("/books/6")
+    response = client.get("/books", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_read_by_bookid_etag_tracks_that_book_only(test_store):
+    etag = client.get("/books/1").headers["etag"]
+    assert (
+        client.get("/books/1", headers={"If-None-Match": f'"x", {etag}'}).status_code
+        == 304
+    )
+
+    client.delete("/books/6")
+    assert client.get("/books/1", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(
+        "/books/",
+        json={
+            "id": 1,
+            "title": "Computer Science Pro",
+            "author": "codingwithroby",
+            "description": "A very nice book!",
+            "rating": 4,
+            "published_year": 2030,
+        },
+    )
+    response = client.get("/books/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["rating"] == 4
+
+
+def test_search_books(test_store):
+    response = client.get("/books/search", params={"q": "master endpoints"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["id"] for book in response.json()] == [3]
+    assert client.get("/books/search", params={"q": ""}).status_code == 422
+
+
+def test_read_by_range(test_store):
+    response = client.get(
+        "/books/range", params={"year_from": 2027, "year_to": 2029, "min_rating": 3}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["id"] for book in response.json()] == [3, 5]
+    assert len(client.get("/books/range").json()) == 6
+    assert client.get("/books/range", params={"max_rating": 6}).status_code == 422
+
+
+def test_query_books(test_store):
+    response = client.get(
+        "/books/query",
+        params={"author": ["Author 1", "Author 2"], "min_rating": 3},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["id"] for book in response.json()] == [5]
+    response = client.get("/books/query", params={"year_from": 2029, "max_rating": 5})
+    assert [book["id"] for book in response.json()] == [1, 2, 3]
+
+
+def test_paginated_walk_ignores_writes_made_after_the_first_page(test_store):
+    response = client.get("/books", params={"limit": 3})
+    next_url = response.headers["link"][1:].split(">")[0]
+
+    client.delete("/books/5")
+    client.put(
+        "/books/",
+        json={
+            "id": 4,
+            "title": "HP1 revised",
+            "author": "Author 1",
+            "description": "Book Description",
+            "rating": 2,
+            "published_year": 2028,
+        },
+    )
+    client.post(
+        "/books/",
+        json={
+            "title": "HP4",
+            "author": "Author 4",
+            "description": "Book Description",
+            "rating": 4,
+            "published_year": 2025,
+        },
+    )
+    books = client.get(next_url).json()
+    assert [(book["id"], book["title"]) for book in books] == [
+        (4, "HP1"),
+        (5, "HP2"),
+        (6, "HP3"),
+    ]
+    fresh = client.get("/books", params={"limit": 3, "cursor": 3}).json()
+    assert [book["id"] for book in fresh] == [4, 6, 7]
+
+
+def test_read_top_books(test_store):
+    response = client.get("/books/top", params={"k": 2, "year": 2030})
+    assert response.status_code == status.HTTP_200_OK
+    assert [book["id"] for book in response.json()] == [1, 2]
+    response = client.get("/books/top", params={"author": "Author 2"})
+    assert [book["id"] for book in response.json()] == [5]
+    assert client.get("/books/top", params={"k": 0}).status_code == 422
+
+
+def test_import_ndjson_and_csv_files(test_store):
+    ndjson = "\n".join(
+        [
+            '{"title": "Imported One", "author": "A", "description": "D", "rating": 4, "published_year": 2024}',
+            "not json",
+            '{"id": 99, "title": "Imported Two", "author": "B", "description": "D", "rating": 3, "published_year": 2023}',
+            '{"title": "X", "author": "C", "description": "D", "rating": 3, "published_year": 2023}',
+        ]
+    )
+    response = client.post(
+        "/books/import", files={"file": ("books.ndjson", ndjson.encode())}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    body = response.json()
+    assert body["imported"] == 2
+    assert [error["index"] for error in body["errors"]] == [1, 3]
+    assert [b.title for b in test_store.all()[-2:]] == ["Imported One", "Imported Two"]
+    assert test_store.all()[-1].id == 8
+
+    csv_file = (
+        "title,author,description,rating,published_year\r\n"
+        'Imported Three,C,"Has, a comma",5,2022\r\n'
+        "Imported Four,D,D,9,2022\r\n"
+    )
+    response = client.post(
+        "/books/import",
+        params={"format": "csv"},
+        files={"file": ("upload", csv_file.encode())},
+    )
+    assert response.json()["imported"] == 1
+    assert response.json()["errors"][0]["index"] == 1
+    assert test_store.get(9).description == "Has, a comma"
+    assert test_store.get(9).rating == 5
+
+
+def test_import_rejects_unreadable_files(test_store):
+    response = client.post(
+        "/books/import", files={"file": ("books.ndjson", b"\xff\xfe bad")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"]["imported"] == 0
+
+    csv_file = "title,author\r\n" + "x" * 200_000 + ",A\r\n"
+    response = client.post(
+        "/books/import",
+        params={"format": "csv"},
+        files={"file": ("upload", csv_file.encode())},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "field larger than field limit" in response.json()["detail"]["message"]
+    assert len(test_store.all()) == 6
+
+
+def test_export_streams_the_catalog(test_store):
+    response = client.get("/books/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="books.ndjson"' in response.headers["content-disposition"]
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+    ]
+    response = client.get("/books/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "id,title,author,description,rating,published_year"
+    assert lines[1] == "1,Computer Science Pro,codingwithroby,A very nice book!,5,2030"
+    assert len(lines) == 7
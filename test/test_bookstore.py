@@ -0,0 +1,200 @@
+import json
+
+import pytest
+
+from .utils import seed_books
+from books2 import Book
+from bookstore import BookCatalog, BookStore, ColumnarBookStore
+from bookstore.responses import ResponseCache
+from bookstore.vectorized import filter_books
+
+store_types = pytest.mark.parametrize("store_type", [BookStore, ColumnarBookStore])
+
+
+@store_types
+def test_lookup_by_id_rating_and_year(store_type):
+    store = store_type(seed_books())
+    assert store.get(4).title == "HP1"
+    assert store.get(999) is None
+    assert [book.id for book in store.by_rating(5)] == [1, 2, 3]
+    assert [book.id for book in store.by_year(2030)] == [1, 2]
+
+
+@store_types
+def test_update_moves_book_between_indexes(store_type):
+    store = store_type(seed_books())
+    book = seed_books()[3]
+    book.rating = 5
+    book.published_year = 2030
+    store.update(book)
+    assert [b.id for b in store.by_rating(2)] == []
+    assert 4 in [b.id for b in store.by_rating(5)]
+    assert [b.id for b in store.by_year(2028)] == []
+    assert [b.id for b in store.all()] == [1, 2, 3, 4, 5, 6]
+
+
+@store_types
+def test_lookups_keep_catalog_order_after_a_book_moves(store_type):
+    # The old list scan returned books in catalog order; a book moved into a
+    # bucket must not be listed after books that were added later.
+    store = store_type(seed_books())
+    store.update(Book(6, "HP3", "Author 3", "Book Description", 2, 2026))
+    store.update(Book(1, "Computer Science Pro", "codingwithroby", "", 2, 2028))
+    assert [b.id for b in store.by_rating(2)] == [1, 4, 6]
+    assert [b.id for b in store.by_year(2028)] == [1, 4]
+    store.update(Book(1, "Computer Science Pro", "codingwithroby", "", 5, 2030))
+    assert [b.id for b in store.by_rating(5)] == [1, 2, 3]
+    assert [b.id for b in store.by_year(2030)] == [1, 2]
+
+
+@store_types
+def test_delete_removes_from_all_indexes(store_type):
+    store = store_type(seed_books())
+    assert store.delete(1).id == 1
+    assert store.delete(1) is None
+    assert 1 not in store
+    assert [b.id for b in store.by_rating(5)] == [2, 3]
+    assert [b.id for b in store.by_year(2030)] == [2]
+
+    store.delete(6)
+    assert store.next_id() == 7
+    assert store.next_id() == 8
+
+
+def test_columnar_store_compacts_tombstones():
+    store = ColumnarBookStore(seed_books())
+    store.compact_min_rows = 2
+    for book_id in (1, 3, 5):
+        store.delete(book_id)
+    assert len(store._ids) == 6
+    store.delete(6)
+    assert len(store._ids) == 2
+    assert [b.title for b in store.all()] == ["Be Fast with FastAPI", "HP1"]
+    assert store.get(4).author == "Author 1"
+    assert [b.id for b in store.by_rating(5)] == [2]
+
+
+@store_types
+def test_page_skips_deleted_books(store_type):
+    store = store_type(seed_books())
+    store.delete(2)
+    store.delete(3)
+    books, cursor = store.page(limit=2)
+    assert [b.id for b in books] == [1, 4]
+    assert cursor == 4
+    books, cursor = store.page(after=cursor, limit=2)
+    assert [b.id for b in books] == [5, 6]
+    assert cursor is None
+
+
+@store_types
+def test_search_ranks_matches_and_follows_writes(store_type):
+    store = store_type(seed_books())
+    assert [b.id for b in store.search("fastapi")] == [2]
+    assert [b.id for b in store.search("codingwithroby great")][0] == 2
+    assert store.search("nothing matches this") == []
+
+    store.update(Book(5, "HP2", "Author 2", "A great FastAPI primer", 3, 2027))
+    store.delete(2)
+    store.add(Book(7, "FastAPI FastAPI", "Someone", "More FastAPI", 4, 2025))
+    assert [b.id for b in store.search("FASTAPI")] == [7, 5]
+
+
+@store_types
+def test_in_range_filters_on_year_and_rating(store_type):
+    store = store_type(seed_books())
+    assert [b.id for b in store.in_range(year_from=2028)] == [1, 2, 3, 4]
+    assert [b.id for b in store.in_range(year_to=2027, min_rating=2)] == [5]
+    assert [b.id for b in store.in_range(2026, 2029, 1, 3)] == [4, 5, 6]
+    assert store.in_range(year_from=2031) == []
+
+    store.update(Book(6, "HP3", "Author 3", "Book Description", 5, 2030))
+    store.delete(1)
+    store.add(Book(7, "HP4", "Author 4", "Book Description", 4, 2029))
+    assert [b.id for b in store.in_range(2029, 2030, 4, 5)] == [2, 3, 6, 7]
+
+
+@store_types
+def test_query_combines_predicates(store_type):
+    store = store_type(seed_books())
+    assert [b.id for b in store.query(min_rating=5, year_to=2029)] == [3]
+    assert [b.id for b in store.query(authors=["AUTHOR 1", "Author 3"])] == [4, 6]
+    assert store.query(authors=["Nobody"]) == []
+
+    store.update(Book(4, "HP1", "Author 3", "Book Description", 4, 2030))
+    store.delete(6)
+    predicates = dict(min_rating=2, year_from=2027, authors=["author 3", "Author 2"])
+    assert [b.id for b in store.query(**predicates)] == [4, 5]
+    assert [b.id for b in filter_books(store.all(), **predicates)] == [4, 5]
+
+
+@store_types
+def test_view_reads_the_catalog_as_of_its_version(store_type):
+    store = store_type(seed_books())
+    with store.view() as view:
+        store.update(Book(4, "HP1 revised", "Author 1", "Book Description", 2, 2028))
+        store.delete(5)
+        store.add(Book(7, "HP4", "Author 4", "Book Description", 4, 2025))
+        assert view.get(4).title == "HP1"
+        assert view.get(7) is None
+        assert [b.id for b in view.all()] == [1, 2, 3, 4, 5, 6]
+        books, cursor = view.page(after=3, limit=2)
+        assert [b.id for b in books] == [4, 5]
+        assert [b.id for b in store.all()] == [1, 2, 3, 4, 6, 7]
+    assert not store._history
+    assert store._history._entries == {}
+
+
+@store_types
+def test_cache_never_files_a_half_applied_write_under_its_version(store_type):
+    cache = ResponseCache()
+
+    class ReadMidWrite(store_type):
+        # A reader on another thread landing while a write is being applied.
+        def _put(self, book, version):
+            cache.response(self, "all", self.all)
+            super()._put(book, version)
+
+    store = ReadMidWrite(seed_books()[:1])
+    store.add(Book(99, "HP99", "Author 9", "Book Description", 4, 2025))
+    body = cache.response(store, "all", store.all).body
+    assert [book["id"] for book in json.loads(body)] == [1, 99]
+
+
+@store_types
+def test_view_at_only_finds_pinned_versions(store_type):
+    store = store_type(seed_books())
+    version = store.view(ttl=60).version
+    store.delete(1)
+    assert [b.id for b in store.view_at(version, ttl=60).all()] == [1, 2, 3, 4, 5, 6]
+    assert store.view_at(store.version, ttl=60) is None
+
+
+@store_types
+def test_top_ranks_by_rating_per_author_and_year(store_type):
+    store = store_type(seed_books())
+    assert [b.id for b in store.top(4)] == [1, 2, 3, 5]
+    assert [b.id for b in store.top(2, author="CODINGWITHROBY")] == [1, 2]
+    assert [b.id for b in store.top(5, year=2030)] == [1, 2]
+    assert [b.id for b in store.top(5, author="codingwithroby", year=2029)] == [3]
+    assert store.top(3, author="Nobody") == []
+
+    store.update(Book(6, "HP3", "Author 3", "Book Description", 5, 2030))
+    store.delete(1)
+    store.add(Book(7, "HP4", "codingwithroby", "Book Description", 4, 2030))
+    assert [b.id for b in store.top(4)] == [2, 3, 6, 7]
+    assert [b.id for b in store.top(5, year=2030)] == [2, 6, 7]
+    assert [b.id for b in store.top(5, author="codingwithroby")] == [2, 3, 7]
+
+
+def test_catalog_facet_labels_survive_updates():
+    catalog = BookCatalog(
+        [
+            {"title": "A", "author": "X", "category": "Science"},
+            {"title": "B", "author": "Y", "category": "SCIENCE"},
+        ]
+    )
+    catalog.update({"title": "A", "author": "Z", "category": "Science"})
+    assert catalog.facets()["category"] == {"Science": 2}
+    catalog.delete("A")
+    assert catalog.facets() == {"category": {"SCIENCE": 1}, "author": {"Y": 1}}
@@ -0,0 +1,125 @@
+import os
+import threading
+
+from .utils import seed_books
+from books2 import Book
+from bookstore import BookCatalog, BookStore, ColumnarBookStore, Journal
+
+
+def open_store(directory, store_type=BookStore, **journal_options):
+    store = store_type(book_type=Book)
+    store.restore(Journal(directory, "books2", **journal_options))
+    return store
+
+
+def test_store_survives_restart(tmp_path):
+    store = open_store(tmp_path)
+    for book in seed_books():
+        store.add(book)
+    store.delete(2)
+    store.update(Book(4, "HP1 revised", "Author 1", "Book Description", 5, 2028))
+    store._journal.close()
+
+    restored = open_store(tmp_path, ColumnarBookStore)
+    assert [b.id for b in restored.all()] == [1, 3, 4, 5, 6]
+    assert restored.get(4).title == "HP1 revised"
+    assert [b.id for b in restored.by_rating(5)] == [1, 3, 4]
+    assert restored.next_id() == 7
+
+
+def test_snapshot_truncates_journal(tmp_path):
+    store = open_store(tmp_path, snapshot_every=4)
+    for book in seed_books():
+        store.add(book)
+    store._journal.wait_for_snapshot()
+    store._journal.close()
+    assert os.path.getsize(tmp_path / "books2.snapshot") > 0
+    assert len((tmp_path / "books2.journal").read_text().splitlines()) == 2
+    assert not os.path.exists(tmp_path / "books2.journal.1")
+
+    restored = open_store(tmp_path)
+    assert [b.id for b in restored.all()] == [1, 2, 3, 4, 5, 6]
+
+
+def test_snapshot_is_written_off_the_write_path(tmp_path, monkeypatch):
+    store = open_store(tmp_path, snapshot_every=4)
+    journal = store._journal
+    release = threading.Event()
+    write_snapshot_file = journal._write_snapshot_file
+
+    def slow_write_snapshot_file(items, next_key):
+        release.wait(5)
+        write_snapshot_file(items, next_key)
+
+    monkeypatch.setattr(journal, "_write_snapshot_file", slow_write_snapshot_file)
+    for book in seed_books():
+        store.add(book)
+    store.update(Book(2, "Rewritten", "Author", "Book Description", 1, 2020))
+    assert journal.snapshot_running()
+    journal.sync()
+
+    # A restart now replays the moved-aside journal and the new one.
+    restored = open_store(tmp_path)
+    assert [b.id for b in restored.all()] == [1, 2, 3, 4, 5, 6]
+    assert restored.get(2).title == "Rewritten"
+
+    release.set()
+    journal.wait_for_snapshot()
+    journal.close()
+    assert not os.path.exists(tmp_path / "books2.journal.1")
+    restored = open_store(tmp_path)
+    assert [b.id for b in restored.all()] == [1, 2, 3, 4, 5, 6]
+    assert restored.get(2).title == "Rewritten"
+    assert not store._history
+
+
+def test_snapshot_keeps_next_id_of_deleted_books(tmp_path):
+    store = open_store(tmp_path)
+    for book in seed_books():
+        store.add(book)
+    store.delete(6)
+    store.snapshot()
+    store._journal.close()
+
+    restored = open_store(tmp_path, ColumnarBookStore)
+    assert [b.id for b in restored.all()] == [1, 2, 3, 4, 5]
+    assert restored.next_id() == 7
+
+    catalog = BookCatalog()
+    catalog.restore(Journal(tmp_path, "books"))
+    catalog.add({"title": "Title One", "author": "Author One", "category": "science"})
+    catalog.delete("title one")
+    catalog.snapshot()
+    catalog._journal.close()
+
+    restored = BookCatalog()
+    restored.restore(Journal(tmp_path, "books"))
+    restored.add({"title": "Title Two", "author": "Author Two", "category": "science"})
+    assert restored.page(after=1)[0][0]["title"] == "Title Two"
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    store = open_store(tmp_path)
+    for book in seed_books():
+        store.add(book)
+    store._journal.close()
+    with open(tmp_path / "books2.journal", "a") as f:
+        f.write('["p",7,["A torn')
+
+    restored = open_store(tmp_path)
+    assert len(restored) == 6
+
+
+def test_catalog_keeps_sequence_numbers_across_restart(tmp_path):
+    catalog = BookCatalog()
+    catalog.restore(Journal(tmp_path, "books"))
+    catalog.add({"title": "Title One", "author": "Author One", "category": "science"})
+    catalog.add({"title": "Title Two", "author": "Author Two", "category": "science"})
+    catalog.delete("title one")
+    catalog._journal.close()
+
+    restored = BookCatalog()
+    restored.restore(Journal(tmp_path, "books"))
+    assert restored.page() == ([restored.find_title("Title Two")], None)
+    assert restored.page(after=1)[0][0]["title"] == "Title Two"
+    assert restored.by_category("SCIENCE") == [restored.find_title("title two")]
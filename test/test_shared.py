@@ -0,0 +1,52 @@
+import pytest
+
+from .utils import seed_books
+from books2 import Book
+from bookstore import SharedBookStore, SharedColumnarBookStore
+
+store_types = pytest.mark.parametrize(
+    "store_type", [SharedBookStore, SharedColumnarBookStore]
+)
+
+
+def open_workers(tmp_path, store_type, count=2):
+    # Each store stands in for one uvicorn worker with its own connection.
+    path = str(tmp_path / "books2.sqlite3")
+    return [store_type(path, seed_books(), Book) for _ in range(count)]
+
+
+@store_types
+def test_writes_are_visible_to_other_workers(tmp_path, store_type):
+    first, second = open_workers(tmp_path, store_type)
+    assert [b.id for b in second.all()] == [1, 2, 3, 4, 5, 6]
+
+    first.add(Book(first.next_id(), "HP4", "Author 4", "Book Description", 4, 2025))
+    first.update(Book(4, "HP1 revised", "Author 1", "Book Description", 5, 2028))
+    first.delete(2)
+    assert [b.id for b in second.all()] == [1, 3, 4, 5, 6, 7]
+    assert second.get(4).title == "HP1 revised"
+    assert [b.id for b in second.by_rating(5)] == [1, 3, 4]
+    assert second.version == first.version
+    assert second.epoch == first.epoch
+    assert second.book_version(4) == first.book_version(4)
+
+
+@store_types
+def test_workers_never_hand_out_the_same_id(tmp_path, store_type):
+    first, second = open_workers(tmp_path, store_type)
+    ids = [first.next_id(), second.next_id(), *second.allocate_ids(3), first.next_id()]
+    assert ids == [7, 8, 9, 10, 11, 12]
+    second.add(Book(ids[1], "HP5", "Author 5", "Book Description", 3, 2024))
+    with pytest.raises(ValueError):
+        first.add(Book(ids[1], "Duplicate", "Author 5", "Book Description", 3, 2024))
+
+
+def test_worker_behind_the_change_log_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(SharedBookStore, "keep_changes", 3)
+    first, second = open_workers(tmp_path, SharedBookStore)
+    for rating in range(1, 6):
+        first.update(Book(1, "Pro", "codingwithroby", "Book Description", rating, 2030))
+    first.delete(6)
+    assert [b.id for b in second.all()] == [1, 2, 3, 4, 5]
+    assert second.get(1).rating == 5
+    assert second.version == first.version
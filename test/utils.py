@@ -0,0 +1,25 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import books2
+from bookstore import BookStore
+
+client = TestClient(books2.app)
+
+
+def seed_books():
+    return [
+        books2.Book(1, "Computer Science Pro", "codingwithroby", "A very nice book!", 5, 2030),
+        books2.Book(2, "Be Fast with FastAPI", "codingwithroby", "A great book!", 5, 2030),
+        books2.Book(3, "Master Endpoints", "codingwithroby", "A awesome book!", 5, 2029),
+        books2.Book(4, "HP1", "Author 1", "Book Description", 2, 2028),
+        books2.Book(5, "HP2", "Author 2", "Book Description", 3, 2027),
+        books2.Book(6, "HP3", "Author 3", "Book Description", 1, 2026),
+    ]
+
+
+@pytest.fixture
+def test_store(monkeypatch):
+    store = BookStore(seed_books())
+    monkeypatch.setattr(books2, "books", store)
+    yield store